@@ -0,0 +1,230 @@
+import asyncio
+import logging
+import pickle
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import Any, Awaitable, Callable, Iterable, Optional
+
+from backend.core.config import PRINCIPAL_CACHE_TTL_SECONDS, PRINCIPAL_CACHE_MAX_SIZE
+from backend.core.metrics import register_metrics
+
+
+class TTLCache:
+    """In-process cache with per-entry expiry and LRU eviction.
+
+    Entries are local to the worker process, so writes must call ``invalidate``
+    explicitly; the TTL bounds staleness across workers.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any):
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Any):
+        if isinstance(key, Hashable) and self._data.pop(key, None) is not None:
+            self.invalidations += 1
+
+    def clear(self):
+        self._data.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_size": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations
+        }
+
+
+class SWRCache:
+    """Byte-budgeted LRU cache with stale-while-revalidate and tag invalidation.
+
+    A fresh entry is served directly. A stale entry (past ``ttl`` but within
+    ``stale_ttl``) is served while one background task refreshes it.
+    Concurrent misses on the same key share a single load. Entries carry
+    tags (e.g. listing ids) so a write can drop every entry that contains it.
+    Values are kept pickled, so every hit returns a private copy.
+    """
+
+    def __init__(self, max_bytes: int, ttl: float, stale_ttl: float):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._data: "OrderedDict[Hashable, dict]" = OrderedDict()
+        self._tags: dict = {}
+        self._inflight: dict = {}
+        # Bumped on every invalidation; a load is not stored if its tags (or the
+        # whole cache) were invalidated after it started
+        self._generation = 0
+        self._cleared_at = 0
+        self._tag_generations: dict = {}
+        self.bytes = 0
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]],
+                          tags: Callable[[Any], Iterable[Hashable]] = lambda value: ()):
+        now = time.monotonic()
+        entry = self._data.get(key)
+        if entry is not None and entry["stale_until"] > now:
+            self._data.move_to_end(key)
+            if entry["fresh_until"] > now:
+                self.hits += 1
+            else:
+                self.stale_hits += 1
+                if key not in self._inflight:
+                    self._inflight[key] = asyncio.ensure_future(self._load(key, loader, tags, self._generation, background=True))
+            return pickle.loads(entry["blob"])
+
+        self.misses += 1
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._load(key, loader, tags, self._generation))
+            self._inflight[key] = task
+            return await asyncio.shield(task)
+        # Callers sharing another caller's load get their own copy
+        value = await asyncio.shield(task)
+        return pickle.loads(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+    async def _load(self, key, loader, tags, generation, background=False):
+        try:
+            value = await loader()
+            value_tags = set(tags(value))
+            if not self._invalidated_since(generation, value_tags):
+                self._store(key, value, value_tags)
+            if background:
+                self.refreshes += 1
+            return value
+        except Exception as e:
+            if not background:
+                raise
+            self.refresh_errors += 1
+            logging.warning(f"Background refresh failed for cache key {key}: {e}")
+        finally:
+            self._inflight.pop(key, None)
+            if not self._inflight:
+                # No load can predate the recorded invalidations any more
+                self._tag_generations.clear()
+
+    def _invalidated_since(self, generation, tags):
+        if self._cleared_at > generation:
+            return True
+        return any(self._tag_generations.get(tag, 0) > generation for tag in tags)
+
+    def _store(self, key, value, tags):
+        self._remove(key)
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        size = len(blob)
+        if size > self.max_bytes:
+            return
+        now = time.monotonic()
+        self._data[key] = {
+            "blob": blob,
+            "size": size,
+            "tags": tags,
+            "fresh_until": now + self.ttl,
+            "stale_until": now + self.ttl + self.stale_ttl
+        }
+        self.bytes += size
+        for tag in tags:
+            self._tags.setdefault(tag, set()).add(key)
+        while self.bytes > self.max_bytes and self._data:
+            oldest = next(iter(self._data))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, key):
+        entry = self._data.pop(key, None)
+        if entry is None:
+            return False
+        self.bytes -= entry["size"]
+        for tag in entry["tags"]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+        return True
+
+    def invalidate_tag(self, tag: Any):
+        if not isinstance(tag, Hashable):
+            return
+        self._generation += 1
+        if self._inflight:
+            self._tag_generations[tag] = self._generation
+        for key in list(self._tags.get(tag, ())):
+            if self._remove(key):
+                self.invalidations += 1
+
+    def clear(self):
+        self._generation += 1
+        self._cleared_at = self._generation
+        self.invalidations += len(self._data)
+        self._data.clear()
+        self._tags.clear()
+        self.bytes = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "entries": len(self._data),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl,
+            "stale_ttl_seconds": self.stale_ttl,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.stale_hits) / lookups, 4) if lookups else 0.0,
+            "refreshes": self.refreshes,
+            "refresh_errors": self.refresh_errors,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations
+        }
+
+
+# Authenticated principals keyed by user id (see auth.utility.get_current_user)
+principal_cache = TTLCache(maxsize=PRINCIPAL_CACHE_MAX_SIZE, ttl=PRINCIPAL_CACHE_TTL_SECONDS)
+register_metrics("principal_cache", principal_cache.stats)
@@ -12,4 +12,48 @@ DATABASE_NAME=os.getenv("DATABASE_NAME","rayy_db")
 
 JWT_ALGORITHM = os.environ.get('JWT_ALGORITHM', 'HS256')
 JWT_SECRET=os.getenv("JWT_SECRET","abcde")
-JWT_EXPIRY_HOURS=os.getenv("JWT_EXPIRY_HOURS",24)
\ No newline at end of file
+JWT_EXPIRY_HOURS=os.getenv("JWT_EXPIRY_HOURS",24)
+
+PRINCIPAL_CACHE_TTL_SECONDS=int(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS",60))
+PRINCIPAL_CACHE_MAX_SIZE=int(os.getenv("PRINCIPAL_CACHE_MAX_SIZE",10000))
+
+BCRYPT_ROUNDS=int(os.getenv("BCRYPT_ROUNDS",12))
+BCRYPT_POOL_SIZE=int(os.getenv("BCRYPT_POOL_SIZE",4))
+BCRYPT_MAX_QUEUE=int(os.getenv("BCRYPT_MAX_QUEUE",64))
+
+ENSURE_INDEXES_ON_STARTUP=os.getenv("ENSURE_INDEXES_ON_STARTUP","true").lower() == "true"
+ENSURE_INDEXES_IN_BACKGROUND=os.getenv("ENSURE_INDEXES_IN_BACKGROUND","false").lower() == "true"
+
+SEARCH_CACHE_TTL_SECONDS=int(os.getenv("SEARCH_CACHE_TTL_SECONDS",15))
+SEARCH_CACHE_STALE_SECONDS=int(os.getenv("SEARCH_CACHE_STALE_SECONDS",60))
+SEARCH_CACHE_MAX_BYTES=int(os.getenv("SEARCH_CACHE_MAX_BYTES",32 * 1024 * 1024))
+
+EMAIL_OUTBOX_BATCH_SIZE=int(os.getenv("EMAIL_OUTBOX_BATCH_SIZE",200))
+EMAIL_OUTBOX_POLL_SECONDS=int(os.getenv("EMAIL_OUTBOX_POLL_SECONDS",5))
+EMAIL_OUTBOX_MAX_ATTEMPTS=int(os.getenv("EMAIL_OUTBOX_MAX_ATTEMPTS",6))
+EMAIL_OUTBOX_BACKOFF_SECONDS=int(os.getenv("EMAIL_OUTBOX_BACKOFF_SECONDS",30))
+EMAIL_OUTBOX_LEASE_SECONDS=int(os.getenv("EMAIL_OUTBOX_LEASE_SECONDS",300))
+
+PARTNER_STATS_RECONCILE_SECONDS=int(os.getenv("PARTNER_STATS_RECONCILE_SECONDS",3600))
+
+SESSION_ADMISSION_REFRESH_SECONDS=int(os.getenv("SESSION_ADMISSION_REFRESH_SECONDS",2))
+SESSION_ADMISSION_MAX_SESSIONS=int(os.getenv("SESSION_ADMISSION_MAX_SESSIONS",10000))
+
+SCHEDULE_CACHE_TTL_SECONDS=int(os.getenv("SCHEDULE_CACHE_TTL_SECONDS",60))
+SCHEDULE_CACHE_STALE_SECONDS=int(os.getenv("SCHEDULE_CACHE_STALE_SECONDS",300))
+SCHEDULE_CACHE_MAX_BYTES=int(os.getenv("SCHEDULE_CACHE_MAX_BYTES",32 * 1024 * 1024))
+SEAT_OVERLAY_TTL_SECONDS=int(os.getenv("SEAT_OVERLAY_TTL_SECONDS",2))
+SEAT_OVERLAY_MAX_SIZE=int(os.getenv("SEAT_OVERLAY_MAX_SIZE",100000))
+WALLET_SNAPSHOT_SECONDS=int(os.getenv("WALLET_SNAPSHOT_SECONDS",3600))
+WALLET_SNAPSHOT_MIN_ENTRIES=int(os.getenv("WALLET_SNAPSHOT_MIN_ENTRIES",50))
+WALLET_SNAPSHOT_SETTLE_SECONDS=int(os.getenv("WALLET_SNAPSHOT_SETTLE_SECONDS",300))
+WALLET_SNAPSHOT_KEEP=int(os.getenv("WALLET_SNAPSHOT_KEEP",2))
+SEAT_HOLD_TTL_SECONDS=int(os.getenv("SEAT_HOLD_TTL_SECONDS",300))
+SEAT_HOLD_SWEEP_SECONDS=int(os.getenv("SEAT_HOLD_SWEEP_SECONDS",60))
+IDEMPOTENCY_TTL_SECONDS=int(os.getenv("IDEMPOTENCY_TTL_SECONDS",24 * 3600))
+IDEMPOTENCY_LEASE_SECONDS=int(os.getenv("IDEMPOTENCY_LEASE_SECONDS",60))
+IDEMPOTENCY_WAIT_SECONDS=int(os.getenv("IDEMPOTENCY_WAIT_SECONDS",30))
+
+LOG_LEVEL=os.getenv("LOG_LEVEL","INFO").upper()
+# Comma-separated logger=rate pairs, e.g. "backend.modules.auth.utility=0.01"; applies to DEBUG records
+LOG_SAMPLE_RATES=os.getenv("LOG_SAMPLE_RATES","")
\ No newline at end of file
@@ -1,6 +1,9 @@
+import logging
 from motor.motor_asyncio import AsyncIOMotorClient
 from backend.core.config import MONGODB_URL, DATABASE_NAME
 
+logger = logging.getLogger(__name__)
+
 class MongoDB:
     client: AsyncIOMotorClient = None
     db = None
@@ -13,16 +16,16 @@ async def connect_to_mongo():
 
     # Test connection
     await mongodb.client.admin.command("ping")
-    print("✅ MongoDB connected")
+    logger.info("MongoDB connected")
 
 async def close_mongo_connection():
     mongodb.client.close()
-    print("🔌 MongoDB disconnected")
+    logger.info("MongoDB disconnected")
 
 # Test connection
 async def test_connection():
     try:
         await mongodb.client.admin.command('ping')
-        print("✅ MongoDB connected successfully")
+        logger.info("MongoDB connected successfully")
     except Exception as e:
-        print(f"❌ MongoDB connection failed: {e}")
\ No newline at end of file
+        logger.error("MongoDB connection failed: %s", e)
\ No newline at end of file
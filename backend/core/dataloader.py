@@ -0,0 +1,118 @@
+import asyncio
+import copy
+from collections.abc import Hashable
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from backend.core.database import mongodb
+
+
+# Loaders registered for the current request, keyed by loader name.
+# None outside of a request (startup, background jobs) so repositories fall back to plain queries.
+_request_loaders: ContextVar[Optional[Dict[str, "DataLoader"]]] = ContextVar("request_loaders", default=None)
+
+
+class DataLoader:
+    """Batches and de-duplicates loads by key within a single request.
+
+    Keys requested in the same event-loop tick are collapsed into one call to
+    ``batch_load_fn``; repeated keys are answered from the request-local map.
+    """
+
+    def __init__(self, batch_load_fn: Callable[[List[Hashable]], Awaitable[List[Any]]]):
+        self.batch_load_fn = batch_load_fn
+        self._cache: Dict[Hashable, asyncio.Future] = {}
+        self._queue: List[tuple] = []
+        # Running batches, referenced so they are not garbage collected mid-flight
+        self._tasks: set = set()
+
+    async def load(self, key: Hashable):
+        future = self._cache.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._cache[key] = future
+            self._queue.append((key, future))
+            if len(self._queue) == 1:
+                loop.call_soon(self._dispatch)
+        result = await asyncio.shield(future)
+        # Callers mutate returned documents, so hand out a private copy
+        return copy.deepcopy(result)
+
+    def clear(self, key: Hashable):
+        self._cache.pop(key, None)
+
+    def _dispatch(self):
+        queue, self._queue = self._queue, []
+        # Futures travel with their keys, so a key cleared and reloaded meanwhile still resolves both
+        keys = [key for key, _ in queue]
+        futures = [future for _, future in queue]
+        task = asyncio.ensure_future(self._run(keys, futures))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, keys: List[Hashable], futures: List[asyncio.Future]):
+        try:
+            results = await self.batch_load_fn(keys)
+        except Exception as e:
+            for key, future in zip(keys, futures):
+                if self._cache.get(key) is future:
+                    del self._cache[key]
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for future, result in zip(futures, results):
+            if not future.done():
+                future.set_result(result)
+
+
+def batch_find(collection: str, field: str, projection: Optional[Dict[str, int]] = None):
+    """Build a batch function that resolves keys with a single ``$in`` query on ``field``."""
+    async def _load(keys: List[Hashable]) -> List[Optional[dict]]:
+        docs = await mongodb.db[collection].find(
+            {field: {"$in": keys}},
+            projection or {"_id": 0}
+        ).to_list(None)
+        by_key = {doc.get(field): doc for doc in docs}
+        return [by_key.get(key) for key in keys]
+    return _load
+
+
+def get_loader(name: str, batch_load_fn: Callable[[List[Hashable]], Awaitable[List[Any]]]) -> Optional[DataLoader]:
+    """Return the request-scoped loader ``name``, creating it on first use.
+
+    Returns None when called outside of a request scope.
+    """
+    loaders = _request_loaders.get()
+    if loaders is None:
+        return None
+    loader = loaders.get(name)
+    if loader is None:
+        loader = DataLoader(batch_load_fn)
+        loaders[name] = loader
+    return loader
+
+
+def clear_loader(name: str, key: Hashable):
+    """Drop ``key`` from the request-scoped loader ``name`` after a write."""
+    loaders = _request_loaders.get()
+    if loaders and name in loaders and isinstance(key, Hashable):
+        loaders[name].clear(key)
+
+
+class DataLoaderMiddleware:
+    """ASGI middleware that gives every HTTP request its own set of loaders."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        token = _request_loaders.set({})
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _request_loaders.reset(token)
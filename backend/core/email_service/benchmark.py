@@ -0,0 +1,50 @@
+"""Measure email render throughput for bulk reminder runs.
+
+    python -m backend.core.email_service.benchmark [-n 20000]
+
+Renders only; nothing is queued or sent.
+"""
+import argparse
+import time
+
+from backend.core.email_service.renderer import load_templates, render_email
+
+
+def _booking(i: int) -> dict:
+    return {
+        "booking_id": f"bk-{i}",
+        "listing_title": f"Junior Robotics {i % 50}",
+        "child_name": f"Child {i}",
+        "child_age": 6 + i % 8,
+        "session_date": "2025-01-18",
+        "session_time": "10:00",
+        "duration": 60,
+        "venue": "Indiranagar Studio" if i % 3 else None,
+        "map_link": "https://maps.example.com/?q=studio",
+        "equipment": "Water bottle" if i % 2 else None,
+    }
+
+
+def run(count: int):
+    started = time.perf_counter()
+    load_templates()
+    print(f"Compiled templates in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    for name in ("reminder_24h", "reminder_2h", "booking_confirmation"):
+        bookings = [_booking(i) for i in range(count)]
+        started = time.perf_counter()
+        size = 0
+        for booking in bookings:
+            size += len(render_email(name, booking_data=booking, base_url="http://localhost:3000"))
+        elapsed = time.perf_counter() - started
+        print(
+            f"{name:<22} {count} renders in {elapsed:.3f}s "
+            f"({count / elapsed:,.0f}/s, {elapsed / count * 1e6:.1f} us each, avg {size // count} bytes)"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark email template rendering")
+    parser.add_argument("-n", "--count", type=int, default=20000, help="renders per template")
+    args = parser.parse_args()
+    run(args.count)
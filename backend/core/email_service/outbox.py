@@ -0,0 +1,222 @@
+"""
+Durable email outbox.
+
+Request handlers only insert into ``email_outbox``; a background worker
+started from ``main.lifespan`` drains it, sends messages grouped by template
+as multi-personalization requests (each recipient's subject and rendered body
+travel in their own personalization), and retries with backoff.
+"""
+
+import asyncio
+import logging
+import uuid
+from collections import deque
+from datetime import datetime, timezone, timedelta
+
+from pymongo import UpdateOne
+
+from backend.core.config import (
+    EMAIL_OUTBOX_BATCH_SIZE, EMAIL_OUTBOX_POLL_SECONDS, EMAIL_OUTBOX_MAX_ATTEMPTS,
+    EMAIL_OUTBOX_BACKOFF_SECONDS, EMAIL_OUTBOX_LEASE_SECONDS
+)
+from backend.core.database import mongodb
+
+# SendGrid accepts at most 1000 personalizations per request
+MAX_PERSONALIZATIONS = 1000
+# ...and at most 10,000 bytes of substitutions per personalization
+MAX_SUBSTITUTION_BYTES = 10000
+MAX_BACKOFF_SECONDS = 3600
+# Shared body of a batched request, replaced per personalization
+BODY_TAG = "-body-"
+# Messages kept by MockTransport for inspection
+MOCK_SENT_LIMIT = 1000
+
+
+class SendGridTransport:
+    """Sends through the blocking SendGrid client on a worker thread."""
+
+    def __init__(self, client):
+        self.client = client
+
+    async def send(self, from_email: str, personalizations: list) -> int:
+        """Send one request; each personalization is a dict with to, subject and html."""
+        from sendgrid.helpers.mail import Mail, Personalization, Substitution, To
+
+        if len(personalizations) == 1:
+            only = personalizations[0]
+            message = Mail(from_email=from_email, to_emails=only["to"], subject=only["subject"], html_content=only["html"])
+        else:
+            message = Mail(from_email=from_email, html_content=BODY_TAG)
+            for item in personalizations:
+                personalization = Personalization()
+                personalization.add_to(To(item["to"]))
+                personalization.subject = item["subject"]
+                personalization.add_substitution(Substitution(BODY_TAG, item["html"]))
+                message.add_personalization(personalization)
+        response = await asyncio.to_thread(self.client.send, message)
+        return response.status_code
+
+
+class MockTransport:
+    """Records messages instead of sending them; used when SendGrid is not configured."""
+
+    def __init__(self, maxlen: int = MOCK_SENT_LIMIT):
+        self.sent = deque(maxlen=maxlen)
+
+    async def send(self, from_email: str, personalizations: list) -> int:
+        for item in personalizations:
+            self.sent.append({"from": from_email, **item})
+        logging.info(f"[MOCK EMAIL] {len(personalizations)} message(s) to {', '.join(p['to'] for p in personalizations)}")
+        return 202
+
+
+class EmailOutbox:
+    def __init__(self, from_email: str, transport):
+        self.from_email = from_email
+        self.transport = transport
+        self._wakeup = None
+        self._stopping = False
+        self.enqueued = 0
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+        self.requests = 0
+
+    async def enqueue(self, template: str, to, subject: str, html: str) -> bool:
+        """Store one message per recipient; returns once it is durable, not sent."""
+        recipients = [to] if isinstance(to, str) else [r for r in (to or []) if r]
+        if not recipients:
+            return False
+
+        now = datetime.now(timezone.utc)
+        await mongodb.db.email_outbox.insert_many([
+            {
+                "id": str(uuid.uuid4()),
+                "template": template,
+                "to": recipient,
+                "subject": subject,
+                "html": html,
+                "status": "pending",
+                "attempts": 0,
+                "next_attempt_at": now,
+                "created_at": now
+            }
+            for recipient in recipients
+        ])
+        self.enqueued += len(recipients)
+        if self._wakeup:
+            self._wakeup.set()
+        return True
+
+    async def run(self):
+        """Drain the outbox until ``stop`` is called."""
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        while not self._stopping:
+            try:
+                drained = await self.drain_once()
+            except Exception as e:
+                logging.error(f"Email outbox drain failed: {e}")
+                drained = 0
+
+            if drained < EMAIL_OUTBOX_BATCH_SIZE:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), EMAIL_OUTBOX_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+
+    def stop(self):
+        self._stopping = True
+        if self._wakeup:
+            self._wakeup.set()
+
+    async def drain_once(self) -> int:
+        messages = await self._claim()
+        if not messages:
+            return 0
+
+        groups = {}
+        for message in messages:
+            # Bodies too large for a substitution go out on their own
+            if len(message["html"].encode()) > MAX_SUBSTITUTION_BYTES:
+                key = (message["template"], message["id"])
+            else:
+                key = (message["template"], None)
+            groups.setdefault(key, []).append(message)
+
+        for (template, _), group in groups.items():
+            for start in range(0, len(group), MAX_PERSONALIZATIONS):
+                await self._send_group(template, group[start:start + MAX_PERSONALIZATIONS])
+        return len(messages)
+
+    async def _claim(self) -> list:
+        """Lease a batch of due messages to this worker.
+
+        Messages left in ``sending`` by a crashed worker become due again once
+        their lease expires.
+        """
+        now = datetime.now(timezone.utc)
+        due = {"$or": [
+            {"status": "pending", "next_attempt_at": {"$lte": now}},
+            {"status": "sending", "claimed_at": {"$lt": now - timedelta(seconds=EMAIL_OUTBOX_LEASE_SECONDS)}}
+        ]}
+        candidates = await mongodb.db.email_outbox.find(due, {"_id": 0, "id": 1}) \
+            .sort("next_attempt_at", 1).limit(EMAIL_OUTBOX_BATCH_SIZE).to_list(None)
+        if not candidates:
+            return []
+
+        claim = str(uuid.uuid4())
+        await mongodb.db.email_outbox.update_many(
+            {"id": {"$in": [c["id"] for c in candidates]}, **due},
+            {"$set": {"status": "sending", "claim": claim, "claimed_at": now}}
+        )
+        return await mongodb.db.email_outbox.find({"claim": claim}, {"_id": 0}).to_list(None)
+
+    async def _send_group(self, template: str, group: list):
+        self.requests += 1
+        try:
+            personalizations = [{"to": m["to"], "subject": m["subject"], "html": m["html"]} for m in group]
+            status = await self.transport.send(self.from_email, personalizations)
+            if not 200 <= status < 300:
+                raise RuntimeError(f"provider returned {status}")
+        except Exception as e:
+            logging.error(f"Failed to send {len(group)} '{template}' email(s): {e}")
+            await self._retry(group, str(e))
+            return
+
+        await mongodb.db.email_outbox.update_many(
+            {"id": {"$in": [m["id"] for m in group]}},
+            {"$set": {"status": "sent", "sent_at": datetime.now(timezone.utc)}, "$unset": {"claim": ""}}
+        )
+        self.sent += len(group)
+
+    async def _retry(self, group: list, error: str):
+        now = datetime.now(timezone.utc)
+        updates = []
+        for message in group:
+            attempts = message["attempts"] + 1
+            if attempts >= EMAIL_OUTBOX_MAX_ATTEMPTS:
+                update = {"status": "failed", "attempts": attempts, "last_error": error}
+                self.failed += 1
+            else:
+                delay = min(EMAIL_OUTBOX_BACKOFF_SECONDS * 2 ** (attempts - 1), MAX_BACKOFF_SECONDS)
+                update = {
+                    "status": "pending",
+                    "attempts": attempts,
+                    "last_error": error,
+                    "next_attempt_at": now + timedelta(seconds=delay)
+                }
+                self.retried += 1
+            updates.append(UpdateOne({"id": message["id"]}, {"$set": update, "$unset": {"claim": ""}}))
+        await mongodb.db.email_outbox.bulk_write(updates, ordered=False)
+
+    def stats(self) -> dict:
+        return {
+            "transport": type(self.transport).__name__,
+            "enqueued": self.enqueued,
+            "sent": self.sent,
+            "requests": self.requests,
+            "retried": self.retried,
+            "failed": self.failed
+        }
@@ -0,0 +1,40 @@
+"""
+Jinja2 rendering for email bodies.
+
+Templates live in ``templates/`` and extend ``_base.html``. The environment
+is built once and every template is compiled by ``load_templates`` at
+startup; ``auto_reload`` is off so renders never stat the filesystem.
+"""
+
+from pathlib import Path
+
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+TEMPLATE_DIR = Path(__file__).resolve().parent / "templates"
+
+env = Environment(
+    loader=FileSystemLoader(TEMPLATE_DIR),
+    autoescape=select_autoescape(["html"]),
+    auto_reload=False,
+    cache_size=-1,
+    trim_blocks=True,
+    lstrip_blocks=True
+)
+
+# Compiled templates keyed by name (file name without ``.html``)
+_templates = {}
+
+
+def load_templates() -> dict:
+    """Compile every email template (and the layouts they extend) once."""
+    for filename in env.list_templates(extensions=["html"]):
+        if not filename.startswith("_"):
+            _templates[filename[:-len(".html")]] = env.get_template(filename)
+    return _templates
+
+
+def render_email(name: str, **context) -> str:
+    template = _templates.get(name)
+    if template is None:
+        template = _templates[name] = env.get_template(f"{name}.html")
+    return template.render(**context)
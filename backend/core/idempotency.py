@@ -0,0 +1,219 @@
+"""
+Idempotency-Key support for mutating endpoints.
+
+The first request for a ``(key, user, route)`` claims a record in
+``idempotency_keys`` and runs; its response (or 4xx error) is stored and
+replayed to every retry until the record expires. Duplicates that arrive
+while the first is still running wait for it instead of running again:
+in-process through a shared future, across workers by polling the record.
+The owner renews its lease while it runs, and a key reused with a different
+request body is rejected with 422.
+
+    @router.post("/")
+    async def create_thing(..., idempotency: IdempotentRequest = Depends(Idempotency("things.create"))):
+        return await idempotency.run(current_user["id"], lambda: service.create_thing(...))
+"""
+
+import asyncio
+import hashlib
+import logging
+import uuid
+from datetime import datetime, timezone, timedelta
+from typing import Any, Awaitable, Callable, Optional
+
+from fastapi import Header, HTTPException, Request, Response
+from fastapi.encoders import jsonable_encoder
+from pymongo.errors import DuplicateKeyError
+
+from backend.core.config import IDEMPOTENCY_TTL_SECONDS, IDEMPOTENCY_LEASE_SECONDS, IDEMPOTENCY_WAIT_SECONDS
+from backend.core.database import mongodb
+from backend.core.metrics import register_metrics
+
+MAX_KEY_LENGTH = 255
+REPLAY_HEADER = "Idempotent-Replayed"
+
+
+def request_fingerprint(*parts) -> str:
+    """Hash of the request parts (path params, body) stored with the key"""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else str(part).encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class IdempotencyStore:
+    def __init__(self):
+        # Requests running in this process, so local duplicates wait without polling
+        self._inflight: dict = {}
+        self.executed = 0
+        self.replayed = 0
+        self.waited = 0
+        self.conflicts = 0
+
+    async def run(self, key: Optional[str], user_id: str, route: str,
+                  fn: Callable[[], Awaitable[Any]], response: Optional[Response] = None,
+                  fingerprint: Optional[str] = None):
+        """Run ``fn`` once per key; retries with the same ``fingerprint`` get the stored result."""
+        if not key:
+            return await fn()
+        if len(key) > MAX_KEY_LENGTH:
+            raise HTTPException(status_code=400, detail="Idempotency-Key is too long")
+
+        scope = {"key": key, "user_id": user_id, "route": route}
+        local = self._inflight.get((key, user_id, route))
+        if local is not None:
+            self.waited += 1
+            try:
+                await asyncio.wait_for(asyncio.shield(local), IDEMPOTENCY_WAIT_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+        deadline = asyncio.get_running_loop().time() + IDEMPOTENCY_WAIT_SECONDS
+        delay = 0.05
+        while True:
+            owner = await self._claim(scope, fingerprint)
+            if owner:
+                return await self._execute(scope, owner, fn)
+
+            record = await mongodb.db.idempotency_keys.find_one(scope, {"_id": 0})
+            if record and record.get("fingerprint") != fingerprint:
+                self.conflicts += 1
+                raise HTTPException(status_code=422, detail="Idempotency-Key was already used with a different request")
+            if record and record["status"] == "done":
+                self.replayed += 1
+                if response is not None:
+                    response.headers[REPLAY_HEADER] = "true"
+                if record.get("error"):
+                    raise HTTPException(status_code=record["error"]["status_code"], detail=record["error"]["detail"])
+                return record.get("response")
+
+            # Another worker is running it; wait for the result or its lease to expire
+            if asyncio.get_running_loop().time() >= deadline:
+                self.conflicts += 1
+                raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is still in progress")
+            self.waited += 1
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 1.0)
+
+    async def _claim(self, scope: dict, fingerprint: Optional[str]) -> Optional[str]:
+        """Insert the in-progress record, or take over one whose lease expired; returns the owner token."""
+        owner = str(uuid.uuid4())
+        now = datetime.now(timezone.utc)
+        try:
+            await mongodb.db.idempotency_keys.insert_one({
+                **scope,
+                "status": "in_progress",
+                "fingerprint": fingerprint,
+                "owner": owner,
+                "claimed_at": now,
+                "expires_at": now + timedelta(seconds=IDEMPOTENCY_TTL_SECONDS)
+            })
+            return owner
+        except DuplicateKeyError:
+            pass
+
+        taken = await mongodb.db.idempotency_keys.update_one(
+            {
+                **scope,
+                "status": "in_progress",
+                "fingerprint": fingerprint,
+                "claimed_at": {"$lt": now - timedelta(seconds=IDEMPOTENCY_LEASE_SECONDS)}
+            },
+            {"$set": {"owner": owner, "claimed_at": now}}
+        )
+        return owner if taken.modified_count else None
+
+    async def _execute(self, scope: dict, owner: str, fn):
+        inflight_key = (scope["key"], scope["user_id"], scope["route"])
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[inflight_key] = future
+        self.executed += 1
+        heartbeat = asyncio.ensure_future(self._heartbeat(scope, owner))
+        try:
+            result = await fn()
+            await self._finish(scope, owner, {"response": jsonable_encoder(result)})
+            return result
+        except HTTPException as e:
+            if e.status_code < 500:
+                # Client errors are part of the outcome and replay like a response
+                await self._finish(scope, owner, {"error": {"status_code": e.status_code, "detail": jsonable_encoder(e.detail)}})
+            else:
+                await self._release(scope, owner)
+            raise
+        except BaseException:
+            # Nothing durable to replay; let the next retry run again
+            await self._release(scope, owner)
+            raise
+        finally:
+            heartbeat.cancel()
+            self._inflight.pop(inflight_key, None)
+            future.set_result(None)
+
+    async def _heartbeat(self, scope: dict, owner: str):
+        """Renew the lease while ``fn`` runs so a slow request is not taken over and run twice."""
+        while True:
+            await asyncio.sleep(IDEMPOTENCY_LEASE_SECONDS / 3)
+            try:
+                renewed = await mongodb.db.idempotency_keys.update_one(
+                    {**scope, "owner": owner, "status": "in_progress"},
+                    {"$set": {"claimed_at": datetime.now(timezone.utc)}}
+                )
+                if not renewed.matched_count:
+                    logging.warning(f"Lost idempotency lease for {scope['route']}")
+                    return
+            except Exception as e:
+                logging.error(f"Failed to renew idempotency lease for {scope['route']}: {e}")
+
+    async def _finish(self, scope: dict, owner: str, outcome: dict):
+        try:
+            await mongodb.db.idempotency_keys.update_one(
+                {**scope, "owner": owner},
+                {"$set": {"status": "done", "completed_at": datetime.now(timezone.utc), **outcome}}
+            )
+        except Exception as e:
+            logging.error(f"Failed to store idempotent response for {scope['route']}: {e}")
+
+    async def _release(self, scope: dict, owner: str):
+        try:
+            await mongodb.db.idempotency_keys.delete_one({**scope, "owner": owner})
+        except Exception as e:
+            logging.error(f"Failed to release idempotency key for {scope['route']}: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "inflight": len(self._inflight),
+            "executed": self.executed,
+            "replayed": self.replayed,
+            "waited": self.waited,
+            "conflicts": self.conflicts
+        }
+
+
+idempotency_store = IdempotencyStore()
+register_metrics("idempotency", idempotency_store.stats)
+
+
+class IdempotentRequest:
+    def __init__(self, key: Optional[str], route: str, response: Response, fingerprint: Optional[str] = None):
+        self.key = key
+        self.route = route
+        self.response = response
+        self.fingerprint = fingerprint
+
+    async def run(self, user_id: str, fn: Callable[[], Awaitable[Any]]):
+        return await idempotency_store.run(self.key, user_id, self.route, fn, self.response, self.fingerprint)
+
+
+class Idempotency:
+    """Dependency reading the ``Idempotency-Key`` header for ``route``; the path, query and body are fingerprinted."""
+
+    def __init__(self, route: str):
+        self.route = route
+
+    async def __call__(self, request: Request, response: Response,
+                       idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")) -> IdempotentRequest:
+        fingerprint = None
+        if idempotency_key:
+            fingerprint = request_fingerprint(request.url.path, request.url.query, await request.body())
+        return IdempotentRequest(idempotency_key, self.route, response, fingerprint)
@@ -0,0 +1,210 @@
+"""Declarative catalog of the MongoDB indexes the application relies on.
+
+Indexes are created idempotently at startup (see ``main.lifespan``) and can be
+diffed against a live database from the command line::
+
+    python -m backend.core.indexes            # report missing / unexpected / unused
+    python -m backend.core.indexes --apply    # create anything missing
+"""
+import argparse
+import asyncio
+import logging
+from typing import Dict, List
+
+from pymongo import ASCENDING, DESCENDING, GEOSPHERE, IndexModel
+from pymongo.errors import OperationFailure
+
+
+INDEX_CATALOG: Dict[str, List[dict]] = {
+    "users": [
+        {"keys": [("id", ASCENDING)], "unique": True},
+        {"keys": [("email", ASCENDING)], "unique": True},
+        {"keys": [("phone", ASCENDING)], "sparse": True},
+    ],
+    "otps": [
+        {"keys": [("identifier", ASCENDING)], "unique": True},
+        # Expire OTP records as soon as expires_at passes
+        {"keys": [("expires_at", ASCENDING)], "expireAfterSeconds": 0},
+    ],
+    "partners": [
+        {"keys": [("id", ASCENDING)], "unique": True},
+        {"keys": [("owner_user_id", ASCENDING)]},
+    ],
+    "partner_stats": [
+        {"keys": [("partner_id", ASCENDING)], "unique": True},
+    ],
+    "listings": [
+        {"keys": [("id", ASCENDING)], "unique": True},
+        {"keys": [("partner_id", ASCENDING), ("status", ASCENDING)]},
+        {"keys": [
+            ("status", ASCENDING), ("approval_status", ASCENDING), ("is_live", ASCENDING),
+            ("trial_available", DESCENDING), ("rating", DESCENDING), ("id", ASCENDING)
+        ]},
+        # GeoJSON point copied from the venue, used by $geoNear search
+        {"keys": [("location", GEOSPHERE)]},
+    ],
+    "venues": [
+        {"keys": [("id", ASCENDING)], "unique": True},
+    ],
+    "sessions": [
+        {"keys": [("id", ASCENDING)], "unique": True},
+        {"keys": [("listing_id", ASCENDING), ("status", ASCENDING), ("date", ASCENDING)]},
+        {"keys": [("listing_id", ASCENDING), ("status", ASCENDING), ("start_at", ASCENDING)]},
+        {"keys": [("listing_id", ASCENDING), ("batch_id", ASCENDING), ("status", ASCENDING), ("date", ASCENDING)]},
+        {"keys": [("seat_holds", ASCENDING)], "sparse": True},
+    ],
+    "seat_holds": [
+        {"keys": [("id", ASCENDING)], "unique": True},
+        # Swept by booking.jobs once older than SEAT_HOLD_TTL_SECONDS
+        {"keys": [("created_at", ASCENDING)]},
+    ],
+    "bookings": [
+        {"keys": [("id", ASCENDING)], "unique": True},
+        {"keys": [("user_id", ASCENDING), ("booked_at", DESCENDING)]},
+        # (date, id) keyset order for partner transaction pages and exports
+        {"keys": [("listing_id", ASCENDING), ("booked_at", DESCENDING), ("id", DESCENDING)]},
+        {"keys": [("session_id", ASCENDING)]},
+        {"keys": [("user_id", ASCENDING), ("is_trial", ASCENDING), ("booked_at", DESCENDING)]},
+        # Upcoming / date-range queries on the denormalized session start
+        {"keys": [("listing_id", ASCENDING), ("session_start_at", ASCENDING)]},
+        {"keys": [("user_id", ASCENDING), ("session_start_at", ASCENDING)]},
+        # Covers the partner financial summary $group
+        {"keys": [
+            ("listing_id", ASCENDING), ("booking_status", ASCENDING),
+            ("payout_eligible", ASCENDING), ("total_inr", ASCENDING)
+        ]},
+    ],
+    "invoices": [
+        {"keys": [("invoice_number", ASCENDING)], "unique": True},
+        {"keys": [("booking_id", ASCENDING)]},
+    ],
+    "wallet": [
+        {"keys": [("user_id", ASCENDING)]},
+        # Debits of in-flight hold-based reservations
+        {"keys": [("credit_holds", ASCENDING)], "sparse": True},
+    ],
+    "wallets": [
+        {"keys": [("user_id", ASCENDING)]},
+    ],
+    "credit_ledger": [
+        # (created_at, id) keyset for ledger pages and snapshot tails
+        {"keys": [("user_id", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)]},
+        # Recently active wallets for the snapshot job
+        {"keys": [("created_at", ASCENDING)]},
+    ],
+    "credit_snapshots": [
+        {"keys": [("user_id", ASCENDING), ("as_of_created_at", DESCENDING), ("as_of_id", DESCENDING)]},
+    ],
+    "payout_requests": [
+        {"keys": [("partner_id", ASCENDING), ("status", ASCENDING)]},
+        {"keys": [("partner_id", ASCENDING), ("requested_at", DESCENDING), ("id", DESCENDING)]},
+    ],
+    "email_outbox": [
+        {"keys": [("id", ASCENDING)], "unique": True},
+        {"keys": [("status", ASCENDING), ("next_attempt_at", ASCENDING)]},
+        {"keys": [("status", ASCENDING), ("claimed_at", ASCENDING)]},
+        {"keys": [("claim", ASCENDING)], "sparse": True},
+        # Drop delivered messages after 30 days; failed ones are kept for inspection
+        {"keys": [("sent_at", ASCENDING)], "expireAfterSeconds": 30 * 24 * 3600},
+    ],
+    "idempotency_keys": [
+        {"keys": [("key", ASCENDING), ("user_id", ASCENDING), ("route", ASCENDING)], "unique": True},
+        # Stored responses are replayable until expires_at
+        {"keys": [("expires_at", ASCENDING)], "expireAfterSeconds": 0},
+    ],
+    "unable_to_attend": [
+        {"keys": [("booking_id", ASCENDING), ("created_at", DESCENDING)]},
+    ],
+}
+
+
+def _index_model(spec: dict) -> IndexModel:
+    options = {k: v for k, v in spec.items() if k != "keys"}
+    return IndexModel(spec["keys"], **options)
+
+
+def _key_signature(keys) -> tuple:
+    return tuple((field, int(direction) if isinstance(direction, (int, float)) else direction) for field, direction in keys)
+
+
+async def ensure_indexes(db) -> dict:
+    """Create every catalog index; existing ones are left untouched.
+
+    Failures (e.g. duplicates blocking a unique index) are logged per index
+    so one bad collection does not stop startup.
+    """
+    created, failed = [], []
+    for collection, specs in INDEX_CATALOG.items():
+        for spec in specs:
+            try:
+                names = await db[collection].create_indexes([_index_model(spec)])
+                created.extend(f"{collection}.{name}" for name in names)
+            except OperationFailure as e:
+                logging.error(f"Failed to create index {spec['keys']} on {collection}: {e}")
+                failed.append({"collection": collection, "keys": spec["keys"], "error": str(e)})
+    return {"ensured": created, "failed": failed}
+
+
+async def diff_indexes(db) -> dict:
+    """Compare the catalog with the live database.
+
+    Returns indexes that are missing, present but not in the catalog, and
+    present but never used since the server started (per ``$indexStats``).
+    """
+    missing, unexpected, unused = [], [], []
+    existing_collections = set(await db.list_collection_names())
+
+    for collection, specs in INDEX_CATALOG.items():
+        if collection not in existing_collections:
+            missing.extend({"collection": collection, "keys": spec["keys"]} for spec in specs)
+            continue
+
+        info = await db[collection].index_information()
+        live = {_key_signature(index["key"]): name for name, index in info.items()}
+        wanted = {_key_signature(spec["keys"]) for spec in specs}
+
+        for spec in specs:
+            if _key_signature(spec["keys"]) not in live:
+                missing.append({"collection": collection, "keys": spec["keys"]})
+
+        for signature, name in live.items():
+            if name != "_id_" and signature not in wanted:
+                unexpected.append({"collection": collection, "name": name})
+
+        async for stat in db[collection].aggregate([{"$indexStats": {}}]):
+            if stat["name"] != "_id_" and stat.get("accesses", {}).get("ops", 0) == 0:
+                unused.append({"collection": collection, "name": stat["name"]})
+
+    return {"missing": missing, "unexpected": unexpected, "unused": unused}
+
+
+async def _main(apply: bool):
+    from motor.motor_asyncio import AsyncIOMotorClient
+    from backend.core.config import MONGODB_URL, DATABASE_NAME
+
+    client = AsyncIOMotorClient(MONGODB_URL)
+    db = client[DATABASE_NAME]
+    try:
+        if apply:
+            result = await ensure_indexes(db)
+            print(f"Ensured {len(result['ensured'])} indexes, {len(result['failed'])} failed")
+            for failure in result["failed"]:
+                print(f"  FAILED {failure['collection']} {failure['keys']}: {failure['error']}")
+
+        report = await diff_indexes(db)
+        for item in report["missing"]:
+            print(f"MISSING     {item['collection']} {item['keys']}")
+        for item in report["unexpected"]:
+            print(f"UNEXPECTED  {item['collection']} {item['name']}")
+        for item in report["unused"]:
+            print(f"UNUSED      {item['collection']} {item['name']}")
+        return 1 if report["missing"] else 0
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Diff the index catalog against the live database")
+    parser.add_argument("--apply", action="store_true", help="create missing indexes before reporting")
+    args = parser.parse_args()
+    raise SystemExit(asyncio.run(_main(args.apply)))
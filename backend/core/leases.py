@@ -0,0 +1,29 @@
+"""
+Cross-worker leases for background jobs.
+
+Every worker starts the same periodic jobs from ``main.lifespan``; a job that
+must run in only one of them takes the named lease in ``job_leases`` before
+each run. The holder renews it by taking it again; if the holder dies the
+lease expires and another worker picks the job up.
+"""
+
+from datetime import datetime, timezone, timedelta
+
+from pymongo.errors import DuplicateKeyError
+
+from backend.core.database import mongodb
+
+
+async def acquire_lease(name: str, holder: str, ttl_seconds: float) -> bool:
+    """Take or renew lease ``name`` for ``holder``; False while another holder's lease is live."""
+    now = datetime.now(timezone.utc)
+    try:
+        await mongodb.db.job_leases.update_one(
+            {"_id": name, "$or": [{"holder": holder}, {"expires_at": {"$lt": now}}]},
+            {"$set": {"holder": holder, "expires_at": now + timedelta(seconds=ttl_seconds)}},
+            upsert=True
+        )
+        return True
+    except DuplicateKeyError:
+        # The lease exists and is held by someone else
+        return False
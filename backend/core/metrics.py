@@ -0,0 +1,13 @@
+from typing import Callable, Dict
+
+
+# Named providers returning a snapshot dict of in-process counters
+_providers: Dict[str, Callable[[], dict]] = {}
+
+
+def register_metrics(name: str, provider: Callable[[], dict]):
+    _providers[name] = provider
+
+
+def collect_metrics() -> dict:
+    return {name: provider() for name, provider in _providers.items()}
@@ -1,26 +1,64 @@
-from fastapi import FastAPI
+import asyncio
+import logging
+from fastapi import FastAPI, Depends, HTTPException
+from typing import Dict
 from contextlib import asynccontextmanager
-from backend.core.database import connect_to_mongo, close_mongo_connection
+from backend.core.database import connect_to_mongo, close_mongo_connection, mongodb
+from backend.core.config import ENSURE_INDEXES_ON_STARTUP, ENSURE_INDEXES_IN_BACKGROUND, PARTNER_STATS_RECONCILE_SECONDS, WALLET_SNAPSHOT_SECONDS, SEAT_HOLD_SWEEP_SECONDS
+from backend.core.indexes import ensure_indexes
+from backend.core.dataloader import DataLoaderMiddleware
+from backend.core.log import setup_logging, shutdown_logging, RequestIdMiddleware
+from backend.core.metrics import collect_metrics
+from backend.modules.auth.utility import get_current_user
 from backend.modules.auth.router import auth_router
 from backend.modules.users.router import user_router
 from backend.modules.listing.router import list_router, category_router
+from backend.modules.partner.jobs import run_partner_stats_reconciler
+from backend.modules.wallet.jobs import run_wallet_snapshotter
+from backend.modules.booking.jobs import run_seat_hold_sweeper
 from backend.core.email_service.email_instance import email_service
 
+setup_logging()
+logger = logging.getLogger(__name__)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     await connect_to_mongo()
+    if ENSURE_INDEXES_ON_STARTUP:
+        if ENSURE_INDEXES_IN_BACKGROUND:
+            app.state.index_task = asyncio.create_task(ensure_indexes(mongodb.db))
+        else:
+            await ensure_indexes(mongodb.db)
     if email_service.client:
-        print("📧 Email service initialized (SendGrid)")
+        logger.info("Email service initialized (SendGrid)")
     else:
-        print("📧 Email service running in MOCK mode")
+        logger.info("Email service running in MOCK mode")
+    app.state.email_task = asyncio.create_task(email_service.outbox.run())
+    if PARTNER_STATS_RECONCILE_SECONDS > 0:
+        app.state.partner_stats_task = asyncio.create_task(run_partner_stats_reconciler(PARTNER_STATS_RECONCILE_SECONDS))
+    if WALLET_SNAPSHOT_SECONDS > 0:
+        app.state.wallet_snapshot_task = asyncio.create_task(run_wallet_snapshotter(WALLET_SNAPSHOT_SECONDS))
+    if SEAT_HOLD_SWEEP_SECONDS > 0:
+        app.state.seat_hold_task = asyncio.create_task(run_seat_hold_sweeper(SEAT_HOLD_SWEEP_SECONDS))
     yield
     # Shutdown
+    email_service.outbox.stop()
+    await app.state.email_task
+    if PARTNER_STATS_RECONCILE_SECONDS > 0:
+        app.state.partner_stats_task.cancel()
+    if WALLET_SNAPSHOT_SECONDS > 0:
+        app.state.wallet_snapshot_task.cancel()
+    if SEAT_HOLD_SWEEP_SECONDS > 0:
+        app.state.seat_hold_task.cancel()
     await close_mongo_connection()
+    shutdown_logging()
 
 
 app = FastAPI(lifespan=lifespan)
+app.add_middleware(DataLoaderMiddleware)
+app.add_middleware(RequestIdMiddleware)
 
 
 @app.get("/")
@@ -28,6 +66,13 @@ async def root():
     return {"message": "Hello World"}
 
 
+@app.get("/api/metrics")
+async def metrics(current_user: Dict = Depends(get_current_user)):
+    if current_user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Admin only")
+    return collect_metrics()
+
+
 app.include_router(auth_router, prefix="/api")
 app.include_router(user_router, prefix="/api")
 app.include_router(list_router, prefix="/api")
@@ -0,0 +1,75 @@
+"""Copy each booking's session start/end onto the booking as ``session_start_at``/``session_end_at``.
+
+    python -m backend.migrations.booking_session_times [--batch-size 1000]
+
+Run after ``backend.migrations.session_times``. Only bookings still missing
+``session_start_at`` are selected, so the migration can be re-run at any point.
+"""
+import argparse
+import asyncio
+import logging
+
+from pymongo import UpdateOne
+
+from backend.core.database import connect_to_mongo, close_mongo_connection, mongodb
+from backend.modules.sessions.utility import session_window
+
+MISSING_TIMES = {"session_start_at": {"$exists": False}}
+
+
+async def backfill(batch_size: int) -> tuple:
+    updated = orphaned = 0
+    last_id = None
+    while True:
+        query = dict(MISSING_TIMES)
+        if last_id is not None:
+            # Skip past bookings whose session is gone instead of re-reading them forever
+            query["_id"] = {"$gt": last_id}
+        bookings = await mongodb.db.bookings.find(query, {"_id": 1, "id": 1, "session_id": 1}) \
+            .sort("_id", 1).limit(batch_size).to_list(None)
+        if not bookings:
+            return updated, orphaned
+
+        # One session read per batch
+        session_ids = list({booking["session_id"] for booking in bookings})
+        sessions = await mongodb.db.sessions.find(
+            {"id": {"$in": session_ids}},
+            {"_id": 0, "id": 1, "start_at": 1, "end_at": 1, "date": 1, "time": 1, "duration_minutes": 1}
+        ).to_list(None)
+        session_map = {session["id"]: session for session in sessions}
+
+        updates = []
+        for booking in bookings:
+            session = session_map.get(booking["session_id"])
+            try:
+                start_at, end_at = session_window(session)
+            except Exception as e:
+                logging.error(f"Cannot derive session times for booking {booking.get('id')}: {e}")
+                orphaned += 1
+                continue
+            updates.append(UpdateOne(
+                {"_id": booking["_id"]},
+                {"$set": {"session_start_at": start_at, "session_end_at": end_at}}
+            ))
+
+        if updates:
+            result = await mongodb.db.bookings.bulk_write(updates, ordered=False)
+            updated += result.modified_count
+        last_id = bookings[-1]["_id"]
+        print(f"… {updated} bookings backfilled")
+
+
+async def main(batch_size: int):
+    await connect_to_mongo()
+    try:
+        updated, orphaned = await backfill(batch_size)
+        print(f"✅ Backfilled {updated} bookings ({orphaned} without a usable session)")
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill booking session_start_at/session_end_at")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(main(args.batch_size))
@@ -0,0 +1,22 @@
+"""Backfill the GeoJSON ``location`` on listings from their venue's lat/lng.
+
+    python -m backend.migrations.listing_locations
+"""
+import asyncio
+
+from backend.core.database import connect_to_mongo, close_mongo_connection, mongodb
+from backend.modules.listing.repository import ListingRepository
+
+
+async def main():
+    await connect_to_mongo()
+    try:
+        await ListingRepository().sync_venue_locations()
+        located = await mongodb.db.listings.count_documents({"location": {"$exists": True}})
+        print(f"✅ {located} listings have a search location")
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,21 @@
+"""Rebuild the partner_stats dashboard counters for every partner.
+
+    python -m backend.migrations.partner_stats
+"""
+import asyncio
+
+from backend.core.database import connect_to_mongo, close_mongo_connection
+from backend.modules.partner.jobs import reconcile_partner_stats
+
+
+async def main():
+    await connect_to_mongo()
+    try:
+        rebuilt = await reconcile_partner_stats()
+        print(f"✅ Rebuilt stats for {rebuilt} partners")
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
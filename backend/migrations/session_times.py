@@ -0,0 +1,65 @@
+"""Backfill ``start_at``/``end_at`` on sessions stored with ``date``/``time`` strings.
+
+    python -m backend.migrations.session_times [--batch-size 1000]
+
+Only sessions still missing either field are selected, so the migration can
+be stopped and re-run at any point and picks up where it left off.
+"""
+import argparse
+import asyncio
+import logging
+
+from pymongo import UpdateOne
+
+from backend.core.database import connect_to_mongo, close_mongo_connection, mongodb
+from backend.modules.sessions.utility import session_window
+
+MISSING_TIMES = {"$or": [{"start_at": {"$exists": False}}, {"end_at": {"$exists": False}}]}
+
+
+async def backfill(batch_size: int) -> tuple:
+    updated = failed = 0
+    last_id = None
+    while True:
+        query = dict(MISSING_TIMES)
+        if last_id is not None:
+            # Skip past rows that could not be parsed instead of re-reading them forever
+            query["_id"] = {"$gt": last_id}
+        sessions = await mongodb.db.sessions.find(
+            query, {"_id": 1, "id": 1, "date": 1, "time": 1, "duration_minutes": 1, "start_at": 1, "end_at": 1}
+        ).sort("_id", 1).limit(batch_size).to_list(None)
+        if not sessions:
+            return updated, failed
+
+        updates = []
+        for session in sessions:
+            try:
+                start_at, end_at = session_window(session)
+            except Exception as e:
+                logging.error(f"Cannot derive times for session {session.get('id')}: {e}")
+                failed += 1
+                continue
+            updates.append(UpdateOne({"_id": session["_id"]}, {"$set": {"start_at": start_at, "end_at": end_at}}))
+
+        if updates:
+            result = await mongodb.db.sessions.bulk_write(updates, ordered=False)
+            updated += result.modified_count
+        last_id = sessions[-1]["_id"]
+        print(f"… {updated} sessions backfilled")
+
+
+async def main(batch_size: int):
+    await connect_to_mongo()
+    try:
+        updated, failed = await backfill(batch_size)
+        remaining = await mongodb.db.sessions.count_documents(MISSING_TIMES)
+        print(f"✅ Backfilled {updated} sessions ({failed} unparseable, {remaining} still missing times)")
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill session start_at/end_at")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(main(args.batch_size))
@@ -0,0 +1,21 @@
+"""Take an initial balance snapshot for every wallet with ledger history.
+
+    python -m backend.migrations.wallet_snapshots
+"""
+import asyncio
+
+from backend.core.database import connect_to_mongo, close_mongo_connection
+from backend.modules.wallet.jobs import snapshot_wallets
+
+
+async def main():
+    await connect_to_mongo()
+    try:
+        taken = await snapshot_wallets(min_entries=1)
+        print(f"✅ Took {taken} wallet balance snapshots")
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
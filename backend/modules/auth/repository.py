@@ -1,4 +1,6 @@
 from backend.core.database import mongodb
+from backend.core.dataloader import get_loader, clear_loader, batch_find
+from backend.core.cache import principal_cache
 from backend.modules.users.models import User, UserRegister
 from backend.modules.auth.models import OTP
 from datetime import datetime, timezone, timedelta
@@ -18,6 +20,10 @@ class AuthRepository:
         return await mongodb.db.users.find_one({"email":email})
     
     async def find_user_by_id(self, id: str, filter = None) -> dict:
+        if not filter and isinstance(id, str):
+            loader = get_loader("users.id", batch_find("users", "id"))
+            if loader:
+                return await loader.load(id)
         projection = {"_id": 0}
         if filter:
                 projection.update(filter)
@@ -73,7 +79,10 @@ class AuthRepository:
         return await mongodb.db.users.find_one({"id": id}, {"_id": 0, "child_profiles": 1})
     
     async def add_child_profile(self, id:str, child):
-        return await mongodb.db.users.update_one(
+        result = await mongodb.db.users.update_one(
         {"id": id},
         {"$push": {"child_profiles": child.model_dump()}}
-    )
\ No newline at end of file
+    )
+        clear_loader("users.id", id)
+        principal_cache.invalidate(id)
+        return result
\ No newline at end of file
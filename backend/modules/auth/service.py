@@ -12,6 +12,8 @@ from backend.modules.wallet.models import Wallet, CreditTransaction
 from backend.modules.auth.utility import hash_password, create_token, verify_password
 from backend.modules.users.models import UserRole
 
+logger = logging.getLogger(__name__)
+
 
 class AuthService:
     def __init__(self, 
@@ -22,8 +24,7 @@ class AuthService:
         self.wallet_repo = wallet_repo
 
     async def register(self, data: UserRegister) -> TokenResponse:
-        # LOG: Received registration data
-        print(f"🔍 REGISTER - Received role: {data.role}")
+        logger.debug("register: requested role %s", data.role)
 
         existing = await  self.auth_repo.user_exists(data.email)
         if existing:
@@ -34,18 +35,11 @@ class AuthService:
             email=data.email,
             phone=data.phone,
             role=data.role,
-            hashed_password=hash_password(data.password)
+            hashed_password=await hash_password(data.password)
         )
 
-        # LOG: User object created
-        print(f"🔍 REGISTER - User object role: {user.role}")
-
         inserted_user = await self.auth_repo.create_user(user)
-
-        # LOG: Verify what was inserted
-        verify_inserted_user = await self.auth_repo.user_exists(data.email)
-        if(verify_inserted_user):
-            print(f"🔍 REGISTER - DB stored role: {inserted_user.get('role')}")
+        logger.info("register: created user %s with role %s", user.id, inserted_user.get("role"))
 
         # Create wallet for customers with welcome bonus
         if user.role == UserRole.customer:
@@ -83,8 +77,7 @@ class AuthService:
     async def login(self, data:UserLogin) -> TokenResponse:
 
         user = await self.auth_repo.find_user(data.email)
-        print(user)
-        if not user or not verify_password(data.password, user["hashed_password"]):
+        if not user or not await verify_password(data.password, user["hashed_password"]):
             raise HTTPException(status_code=401, detail="Invalid credentials")
         token = create_token(user["id"], user["role"])
         user_resp = UserResponse(
@@ -165,7 +158,7 @@ class AuthService:
                 email=identifier if is_email else f"{identifier}@phone.user",
                 phone=identifier if not is_email else None,
                 role=UserRole(role),
-                hashed_password=hash_password(str(uuid.uuid4()))  # Random password
+                hashed_password=await hash_password(str(uuid.uuid4()))  # Random password
             )
 
             await self.auth_repo.create_user(user)
@@ -223,20 +216,19 @@ class AuthService:
         return {"message":"Logged out Successfully"}
     
     async def get_me(self, current_user):
-            # LOG: What role is in current_user from JWT
-        print(f"🔍 /auth/me - current_user role from JWT: {current_user.get('role')}")
-
         db_user= await self.auth_repo.find_user_by_id(current_user["id"])
-        print(f"🔍 /auth/me - DB role for user: {db_user.get('role') if db_user else 'NOT FOUND'}")
+        logger.debug("/auth/me: token role %s, stored role %s", current_user.get("role"), db_user.get("role") if db_user else "NOT FOUND")
 
+        # current_user is the slim cached principal; profile fields come from the DB read
+        user = db_user or current_user
         return UserResponse(
-            id=current_user["id"],
-            role=UserRole(current_user["role"]),
-            name=current_user["name"],
-            email=current_user["email"],
-            phone=current_user.get("phone"),
-            child_profiles=[ChildProfile(**cp) for cp in current_user.get("child_profiles", [])],
-            onboarding_complete=current_user.get("onboarding_complete", False)
+            id=user["id"],
+            role=UserRole(user["role"]),
+            name=user["name"],
+            email=user["email"],
+            phone=user.get("phone"),
+            child_profiles=[ChildProfile(**cp) for cp in user.get("child_profiles", [])],
+            onboarding_complete=user.get("onboarding_complete", False)
         )
     
     async def get_child_profile(self, current_user:Dict):
@@ -258,10 +250,7 @@ class AuthService:
             if current_user["role"] not in ["customer", "partner_owner", "partner_staff"]:
                 raise HTTPException(status_code=403, detail="Access denied")
                 
-            await self.auth_repo.users.update_one(
-            {"id": current_user["id"]},
-            {"$push": {"child_profiles": child.model_dump()}}
-            )
+            await self.auth_repo.add_child_profile(current_user["id"], child)
     
             return {"message": "Child added successfully"}
         except HTTPException:
@@ -1,20 +1,89 @@
 from fastapi import Depends, security, HTTPException
 from typing import Dict
 from fastapi.security import  HTTPBearer, HTTPAuthorizationCredentials
+import asyncio
 import bcrypt
 import jwt
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone, timedelta
 from backend.modules.auth.repository import AuthRepository
 from backend.core.config import JWT_ALGORITHM, JWT_EXPIRY_HOURS, JWT_SECRET
+from backend.core.config import BCRYPT_ROUNDS, BCRYPT_POOL_SIZE, BCRYPT_MAX_QUEUE
+from backend.core.cache import principal_cache
+from backend.core.metrics import register_metrics
 
 security = HTTPBearer()
+logger = logging.getLogger(__name__)
 
-def hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+# Fields handlers read from current_user; heavy fields (hashed_password, wishlist, child_profiles) stay in Mongo
+PRINCIPAL_PROJECTION = {"id": 1, "role": 1, "name": 1, "email": 1, "phone": 1, "onboarding_complete": 1, "kyc_status": 1}
 
-def verify_password(password: str, hashed: str) -> bool:
+# bcrypt is CPU-bound (and releases the GIL), so it runs on a dedicated pool instead of the event loop
+_bcrypt_executor = ThreadPoolExecutor(max_workers=BCRYPT_POOL_SIZE, thread_name_prefix="bcrypt")
+_bcrypt_in_flight = 0
+_bcrypt_stats = {
+    "calls": 0,
+    "rejected": 0,
+    "queue_wait_ms_total": 0.0,
+    "queue_wait_ms_max": 0.0,
+    "hash_ms_total": 0.0,
+    "hash_ms_max": 0.0
+}
+
+def _bcrypt_metrics() -> dict:
+    calls = _bcrypt_stats["calls"]
+    return {
+        **_bcrypt_stats,
+        "in_flight": _bcrypt_in_flight,
+        "pool_size": BCRYPT_POOL_SIZE,
+        "max_queue": BCRYPT_MAX_QUEUE,
+        "rounds": BCRYPT_ROUNDS,
+        "queue_wait_ms_avg": round(_bcrypt_stats["queue_wait_ms_total"] / calls, 2) if calls else 0.0,
+        "hash_ms_avg": round(_bcrypt_stats["hash_ms_total"] / calls, 2) if calls else 0.0
+    }
+
+register_metrics("bcrypt", _bcrypt_metrics)
+
+async def _run_bcrypt(fn, *args):
+    global _bcrypt_in_flight
+    if _bcrypt_in_flight >= BCRYPT_POOL_SIZE + BCRYPT_MAX_QUEUE:
+        _bcrypt_stats["rejected"] += 1
+        raise HTTPException(status_code=503, detail="Server busy, please retry", headers={"Retry-After": "1"})
+
+    enqueued_at = time.perf_counter()
+
+    def _timed():
+        started_at = time.perf_counter()
+        result = fn(*args)
+        return result, started_at - enqueued_at, time.perf_counter() - started_at
+
+    _bcrypt_in_flight += 1
+    try:
+        result, queue_wait, hash_time = await asyncio.get_running_loop().run_in_executor(_bcrypt_executor, _timed)
+    finally:
+        _bcrypt_in_flight -= 1
+
+    _bcrypt_stats["calls"] += 1
+    _bcrypt_stats["queue_wait_ms_total"] += queue_wait * 1000
+    _bcrypt_stats["queue_wait_ms_max"] = max(_bcrypt_stats["queue_wait_ms_max"], queue_wait * 1000)
+    _bcrypt_stats["hash_ms_total"] += hash_time * 1000
+    _bcrypt_stats["hash_ms_max"] = max(_bcrypt_stats["hash_ms_max"], hash_time * 1000)
+    return result
+
+def _hash_password(password: str) -> str:
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode('utf-8')
+
+def _verify_password(password: str, hashed: str) -> bool:
     return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
 
+async def hash_password(password: str) -> str:
+    return await _run_bcrypt(_hash_password, password)
+
+async def verify_password(password: str, hashed: str) -> bool:
+    return await _run_bcrypt(_verify_password, password, hashed)
+
 def create_token(user_id: str, role: str) -> str:
     payload = {
         "sub": user_id,
@@ -27,14 +96,17 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     try:
         token = credentials.credentials
         payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
-        print(f"🔍 JWT Payload - sub (user_id): {payload.get('sub')}, role: {payload.get('role')}")
-        
-        user = await auth_repo.find_user_by_id(payload["sub"])
-        if not user:
-            raise HTTPException(status_code=401, detail="User not found")
-        
-        print(f"🔍 get_current_user - DB returned role: {user.get('role')} for user: {user.get('email')}")
-        return user
+        user_id = payload["sub"]
+
+        user = principal_cache.get(user_id)
+        if user is None:
+            user = await auth_repo.find_user_by_id(user_id, filter=PRINCIPAL_PROJECTION)
+            if not user:
+                raise HTTPException(status_code=401, detail="User not found")
+            principal_cache.set(user_id, user)
+
+        logger.debug("get_current_user - user: %s, role: %s", user_id, user.get("role"))
+        return dict(user)
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token expired")
     except jwt.InvalidTokenError:
@@ -0,0 +1,45 @@
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timezone, timedelta
+
+from backend.core.config import SEAT_HOLD_TTL_SECONDS
+from backend.core.leases import acquire_lease
+from backend.modules.booking.repository import BookingRepository
+
+
+async def release_expired_seat_holds() -> int:
+    """Settle hold-based reservations left behind by a worker that died mid-reservation.
+
+    A hold whose bookings all made it in is completed (ledger entry written,
+    hold tags pulled); anything else is undone: partial bookings removed, the
+    debit refunded and the held seats released.
+    """
+    repo = BookingRepository()
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=SEAT_HOLD_TTL_SECONDS)
+    settled = 0
+    for hold in await repo.get_expired_seat_holds(cutoff):
+        try:
+            if await repo.count_bookings_by_ids(hold["booking_ids"]) == len(hold["booking_ids"]):
+                done = await repo.complete_seat_hold(hold["id"])
+            else:
+                done = await repo.undo_seat_hold(hold["id"])
+            settled += done
+        except Exception as e:
+            logging.error(f"Failed to settle seat hold {hold['id']}: {e}")
+    return settled
+
+
+async def run_seat_hold_sweeper(interval_seconds: int):
+    """Periodically settle expired seat holds (started from main.lifespan in every worker; one runs it)."""
+    holder = str(uuid.uuid4())
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            if not await acquire_lease("seat_hold_sweeper", holder, 2 * interval_seconds):
+                continue
+            settled = await release_expired_seat_holds()
+            if settled:
+                logging.info(f"Settled {settled} expired seat holds")
+        except Exception as e:
+            logging.error(f"Seat hold sweep failed: {e}")
@@ -22,6 +22,9 @@ class Booking(BaseModel):
     user_id: str
     session_id: str
     listing_id: str
+    # Copied from the session so date-range queries on bookings need no join
+    session_start_at: Optional[datetime] = None
+    session_end_at: Optional[datetime] = None
     child_profile_name: str
     child_profile_age: int
     qty: int = 1
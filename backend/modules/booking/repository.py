@@ -1,8 +1,205 @@
+import logging
+import uuid
+from datetime import datetime, timezone, timedelta
+
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import OperationFailure
+
+from backend.core.config import SEAT_HOLD_TTL_SECONDS
 from backend.core.database import mongodb
+from backend.core.dataloader import clear_loader
 from backend.modules.booking.models import Booking
+from backend.modules.sessions.cache import seat_overlay
+
+
+class SeatUnavailableError(Exception):
+    """Raised when any session in a multi-session reservation is full or no longer scheduled."""
+
+
+class InsufficientCreditsError(Exception):
+    """Raised when the wallet no longer holds the credits a reservation debits."""
+
+
+# Flipped off the first time the server rejects a transaction (standalone mongod)
+_transactions_supported = True
+
+
+def _seat_update(session_id, update):
+    return UpdateOne(
+        {
+            "id": session_id,
+            "status": "scheduled",
+            "$expr": {"$lt": ["$seats_booked", "$seats_total"]}
+        },
+        update
+    )
+
+
+def _debit_filter(user_id, credits):
+    return {"user_id": user_id, "credits_balance": {"$gte": credits}}
+
 
 class BookingRepository:
         
+        async def reserve_and_create_bookings(self, booking_docs, user_id=None, credits=0, ledger_entry=None):
+            """Reserve one seat per booking, debit ``credits`` and insert the bookings as one unit of work.
+
+            On a replica set the seat increments (one conditional bulk_write),
+            the conditional wallet debit, the booking inserts and the ledger
+            entry all run in one transaction. On a standalone server a
+            ``seat_holds`` document tracks each step so a failed reservation is
+            compensated, and release_expired_seat_holds finishes or undoes
+            reservations whose worker died.
+            Raises SeatUnavailableError or InsufficientCreditsError.
+            """
+            global _transactions_supported
+            session_ids = [doc["session_id"] for doc in booking_docs]
+
+            try:
+                if _transactions_supported:
+                    try:
+                        async with await mongodb.client.start_session() as db_session:
+                            await db_session.with_transaction(
+                                lambda s: self._reserve_in_transaction(booking_docs, session_ids, user_id, credits, ledger_entry, s)
+                            )
+                        return
+                    except OperationFailure as e:
+                        # IllegalOperation: transactions need a replica set or mongos
+                        if e.code != 20:
+                            raise
+                        logging.warning("MongoDB transactions unavailable; using hold-based seat reservation")
+                        _transactions_supported = False
+
+                await self._reserve_with_holds(booking_docs, session_ids, user_id, credits, ledger_entry)
+            finally:
+                for session_id in session_ids:
+                    clear_loader("sessions.id", session_id)
+                    seat_overlay.invalidate(session_id)
+
+        async def _reserve_in_transaction(self, booking_docs, session_ids, user_id, credits, ledger_entry, db_session):
+            result = await mongodb.db.sessions.bulk_write(
+                [_seat_update(session_id, {"$inc": {"seats_booked": 1}}) for session_id in session_ids],
+                session=db_session
+            )
+            if result.modified_count != len(session_ids):
+                # Raising inside the callback aborts the transaction
+                raise SeatUnavailableError()
+            if credits > 0:
+                debit = await mongodb.db.wallet.update_one(
+                    _debit_filter(user_id, credits),
+                    {"$inc": {"credits_balance": -credits}},
+                    session=db_session
+                )
+                if debit.matched_count == 0:
+                    raise InsufficientCreditsError()
+            await mongodb.db.bookings.insert_many(booking_docs, session=db_session)
+            if ledger_entry:
+                await mongodb.db.credit_ledger.insert_one(ledger_entry, session=db_session)
+
+        async def _reserve_with_holds(self, booking_docs, session_ids, user_id, credits, ledger_entry):
+            hold = {
+                "id": str(uuid.uuid4()),
+                "session_ids": session_ids,
+                "booking_ids": [doc["id"] for doc in booking_docs],
+                "user_id": user_id,
+                "credits": credits,
+                "ledger_entry": ledger_entry,
+                "created_at": datetime.now(timezone.utc)
+            }
+            await mongodb.db.seat_holds.insert_one(hold)
+
+            result = await mongodb.db.sessions.bulk_write(
+                [
+                    _seat_update(session_id, {"$inc": {"seats_booked": 1}, "$push": {"seat_holds": hold["id"]}})
+                    for session_id in session_ids
+                ],
+                ordered=False
+            )
+            if result.modified_count != len(session_ids):
+                await self.undo_seat_hold(hold["id"])
+                raise SeatUnavailableError()
+
+            if credits > 0:
+                # The debit is tagged with the hold like the seats, so an undo can tell whether it happened
+                debit = await mongodb.db.wallet.update_one(
+                    _debit_filter(user_id, credits),
+                    {"$inc": {"credits_balance": -credits}, "$push": {"credit_holds": hold["id"]}}
+                )
+                if debit.matched_count == 0:
+                    await self.undo_seat_hold(hold["id"])
+                    raise InsufficientCreditsError()
+
+            try:
+                await mongodb.db.bookings.insert_many(booking_docs)
+            except Exception:
+                await self.undo_seat_hold(hold["id"])
+                raise
+            await self.complete_seat_hold(hold["id"])
+
+        async def _claim_seat_hold(self, hold_id):
+            """Take a hold for settling; None if another worker is settling it (or already has)."""
+            now = datetime.now(timezone.utc)
+            return await mongodb.db.seat_holds.find_one_and_update(
+                {
+                    "id": hold_id,
+                    "$or": [
+                        {"settling_at": None},
+                        {"settling_at": {"$lt": now - timedelta(seconds=SEAT_HOLD_TTL_SECONDS)}}
+                    ]
+                },
+                {"$set": {"settling_at": now}},
+                projection={"_id": 0},
+                return_document=ReturnDocument.AFTER
+            )
+
+        async def complete_seat_hold(self, hold_id):
+            """Finish a reservation whose bookings are all inserted."""
+            hold = await self._claim_seat_hold(hold_id)
+            if not hold:
+                return False
+            if hold.get("ledger_entry"):
+                # Stamped now: a swept hold settles after the snapshot settle window, and an
+                # entry dated at reservation time could land behind a wallet snapshot
+                await mongodb.db.credit_ledger.update_one(
+                    {"id": hold["ledger_entry"]["id"]},
+                    {"$setOnInsert": {**hold["ledger_entry"], "created_at": datetime.now(timezone.utc)}},
+                    upsert=True
+                )
+            await mongodb.db.wallet.update_one({"credit_holds": hold_id}, {"$pull": {"credit_holds": hold_id}})
+            await mongodb.db.sessions.update_many({"seat_holds": hold_id}, {"$pull": {"seat_holds": hold_id}})
+            await mongodb.db.seat_holds.delete_one({"id": hold_id})
+            return True
+
+        async def undo_seat_hold(self, hold_id):
+            """Release the held seats, refund a debit and drop any bookings of a failed reservation.
+
+            Every step is keyed on the hold's tags, so a retry after a crash
+            never refunds or releases twice.
+            """
+            hold = await self._claim_seat_hold(hold_id)
+            if not hold:
+                return False
+            await mongodb.db.bookings.delete_many({"id": {"$in": hold["booking_ids"]}})
+            if hold.get("credits"):
+                await mongodb.db.wallet.update_one(
+                    {"user_id": hold["user_id"], "credit_holds": hold_id},
+                    {"$inc": {"credits_balance": hold["credits"]}, "$pull": {"credit_holds": hold_id}}
+                )
+            await mongodb.db.sessions.update_many(
+                {"seat_holds": hold_id},
+                {"$inc": {"seats_booked": -1}, "$pull": {"seat_holds": hold_id}}
+            )
+            await mongodb.db.seat_holds.delete_one({"id": hold_id})
+            for session_id in hold["session_ids"]:
+                seat_overlay.invalidate(session_id)
+            return True
+
+        async def get_expired_seat_holds(self, older_than):
+            return await mongodb.db.seat_holds.find({"created_at": {"$lt": older_than}}, {"_id": 0}).to_list(None)
+
+        async def count_bookings_by_ids(self, booking_ids):
+            return await mongodb.db.bookings.count_documents({"id": {"$in": booking_ids}})
+        
         async def find_booking(self, bookind_id: str):
               return await mongodb.db.bookings.find_one({"id":bookind_id})
         
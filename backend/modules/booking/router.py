@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, Request
 from typing import Optional, Dict, Any, List
 from datetime import datetime, timezone
+from backend.core.idempotency import Idempotency, IdempotentRequest
 from backend.modules.auth.utility import get_current_user
 from backend.modules.booking.schemas import BookingCreateV2, BookingCreate, PlanBookingCreate
 from backend.modules.booking.models import RescheduleRequest
@@ -13,18 +14,20 @@ booking_router = APIRouter(prefix="/bookings", tags=["Booking"])
 async def create_booking(
     data: BookingCreate, 
     current_user: Dict = Depends(get_current_user),
-    booking_service: BookingService = Depends(get_booking_service)
+    booking_service: BookingService = Depends(get_booking_service),
+    idempotency: IdempotentRequest = Depends(Idempotency("bookings.create"))
     ):
-    return await booking_service.create_booking(data, current_user)
+    return await idempotency.run(current_user["id"], lambda: booking_service.create_booking(data, current_user))
 
 @booking_router.post("bookings/v2")
 async def create_booking_v2(
     booking_data: BookingCreateV2,
     current_user: Dict = Depends(get_current_user),
-    booking_service: BookingService = Depends(get_booking_service)
+    booking_service: BookingService = Depends(get_booking_service),
+    idempotency: IdempotentRequest = Depends(Idempotency("bookings.create_v2"))
 
 ):
-    return await booking_service.create_booking_v2(booking_data, current_user)
+    return await idempotency.run(current_user["id"], lambda: booking_service.create_booking_v2(booking_data, current_user))
 
 @booking_router.get("/listings/{listing_id}/booking-options")
 async def get_booking_options(
@@ -45,8 +48,12 @@ async def check_trial_eligibility(
 async def create_plan_booking(
     data: PlanBookingCreate, 
     current_user: Dict = Depends(get_current_user),
-    booking_service: BookingService = Depends(get_booking_service)):
-        return await booking_service.create_plan_booking(data=data, current_user=current_user)
+    booking_service: BookingService = Depends(get_booking_service),
+    idempotency: IdempotentRequest = Depends(Idempotency("bookings.create_plan"))):
+        return await idempotency.run(
+            current_user["id"],
+            lambda: booking_service.create_plan_booking(data=data, current_user=current_user)
+        )
 
 @booking_router.get("/my")
 async def get_my_bookings(
@@ -11,7 +11,9 @@ from backend.modules.users.repository import UserRepository
 from backend.modules.listing.repository import ListingRepository
 from backend.modules.partner.repository import PartnerRepository
 from backend.modules.sessions.repository import SessionRepository
-from backend.modules.booking.repository import BookingRepository
+from backend.modules.sessions.admission import session_admission
+from backend.modules.sessions.utility import session_window
+from backend.modules.booking.repository import BookingRepository, SeatUnavailableError, InsufficientCreditsError
 from backend.modules.invoice.repository import InvoiceRepository
 from backend.modules.wallet.models import CreditLedger
 from backend.modules.booking.models import Booking, BookingStatus
@@ -110,11 +112,14 @@ class BookingService:
             # Create bookings for each session
             booking_ids = []
             for session in sessions:
+                session_start_at, session_end_at = session_window(session)
                 booking = {
                     "id": str(uuid.uuid4()),
                     "user_id": current_user["id"],
                     "session_id": session["id"],
                     "listing_id": booking_data.listing_id,
+                    "session_start_at": session_start_at,
+                    "session_end_at": session_end_at,
                     "child_profile_name": booking_data.child_profile_name,
                     "child_profile_age": booking_data.child_profile_age,
                     "qty": 1,
@@ -131,6 +136,7 @@ class BookingService:
                     "session_ids": booking_data.session_ids
                 }
                 await self.booking_repo.add_booking(booking)
+                await self.partner_repo.record_booking(listing["partner_id"], booking)
                 booking_ids.append(booking["id"])
                 
                 # Update session seats
@@ -245,11 +251,17 @@ class BookingService:
             return []
         
     async def create_booking(self, data, current_user):
+        ticket = None
         try: 
             # Allow customers and partners to create bookings for themselves/their kids
             if current_user["role"] not in ["customer", "partner_owner", "partner_staff"]:
                 raise HTTPException(status_code=403, detail="Access denied")
             
+            # Reject up front when every remaining seat already has a request in flight
+            ticket = await session_admission.acquire(data.session_id)
+            if ticket is None:
+                raise HTTPException(status_code=400, detail="No seats available")
+            
             # Validate trial eligibility if this is a trial booking
             if data.is_trial:
                 # Check if listing offers trial
@@ -329,7 +341,7 @@ class BookingService:
             
             # Atomic seat reservation
             result = await self.session_repo.atomic_seat_reservation(session_id=data.session_id, seats_total=session["seats_total"])
- 
+            ticket.settle(reserved=result.modified_count > 0)
             
             if result.modified_count == 0:
                 raise HTTPException(status_code=400, detail="No seats available")
@@ -390,10 +402,13 @@ class BookingService:
                     payment_txn_id = f"razorpay_{uuid.uuid4().hex[:12]}"
             
             # Create booking
+            session_start_at, session_end_at = session_window(session)
             booking = Booking(
                 user_id=current_user["id"],
                 session_id=data.session_id,
                 listing_id=session["listing_id"],
+                session_start_at=session_start_at,
+                session_end_at=session_end_at,
                 child_profile_name=data.child_profile_name,
                 child_profile_age=data.child_profile_age,
                 qty=1,
@@ -408,6 +423,7 @@ class BookingService:
             )
             
             await self.booking_repo.add_booking(booking_doc=booking)
+            await self.partner_repo.record_booking(listing.get("partner_id"), booking.model_dump())
             
             # AUTO-GENERATE INVOICE for this booking
             try:
@@ -416,8 +432,7 @@ class BookingService:
                 # Generate invoice number
                 today = datetime.now(timezone.utc)
                 date_str = today.strftime("%Y%m%d")
-                count = await self.invoice_repo.generate_invoice_number(date= date_str)
-                invoice_number = f"INV-{date_str}-{str(count + 1).zfill(4)}"
+                invoice_number = await self.invoice_repo.generate_invoice_number(date=date_str)
                 
                 logging.info(f"Generated invoice number: {invoice_number}")
                 
@@ -472,6 +487,9 @@ class BookingService:
         except Exception as e:
             logging.error(f"Error in add_children: {e}")
             return []
+        finally:
+            if ticket:
+                ticket.release()
 
     async def create_plan_booking(self, data, current_user):
         try:
@@ -575,15 +593,7 @@ class BookingService:
                 if not wallet or wallet["credits_balance"] < credit_cost:
                     raise HTTPException(status_code=400, detail="Insufficient credits")
                 
-                await self.wallet_repo.update_wallet(id=current_user["id"], credits_used=credit_cost)
-                
-                ledger_entry = CreditLedger(
-                    user_id=current_user["id"],
-                    delta=-credit_cost,
-                    reason="booking"
-                )
-                await self.wallet_repo.create_credit_ledger(creadit_leadger=ledger_entry)
-                
+                # Fast fail only; the debit itself is conditional and runs with the seat reservation
                 credits_used = credit_cost
                 grand_total = 0
             else:
@@ -592,28 +602,14 @@ class BookingService:
                 else:
                     payment_txn_id = f"razorpay_{uuid.uuid4().hex[:12]}"
             
-            # Create bookings for each selected session
-            booking_ids = []
-            for session in selected_sessions:
-                # Reserve seat
-                result = await self.session_repo.atomic_seat_reservation(session_id=session["id"], seats_total=session["seats_total"])
-                
-                if result.modified_count == 0:
-                    # Rollback previous reservations
-                    for prev_booking_id in booking_ids:
-                        prev_booking = await self.booking_repo.find_booking(bookind_id=prev_booking_id)
-                        if prev_booking:
-                            await self.session_repo.update_session(session_id= prev_booking["session_id"])
-
-                            await self.session_repo.delete_session(session_id=prev_booking_id)
-                    
-                    raise HTTPException(status_code=400, detail=f"Failed to reserve seat for session on {session.get('date')}")
-                
-                # Create booking
-                booking = Booking(
+            # Build every booking up front, then reserve all seats and insert them in one unit of work
+            bookings = [
+                Booking(
                     user_id=current_user["id"],
                     session_id=session["id"],
                     listing_id=data.listing_id,
+                    session_start_at=session_start_at,
+                    session_end_at=session_end_at,
                     child_profile_name=data.child_profile_name,
                     child_profile_age=data.child_profile_age,
                     qty=1,
@@ -626,25 +622,59 @@ class BookingService:
                     booking_status=BookingStatus.confirmed,
                     is_trial=is_trial
                 )
-                
-                await self.booking_repo.add_booking(booking_doc=booking)
-                booking_ids.append(booking.id)
-                
-                # AUTO-GENERATE INVOICE for each booking
+                for session, (session_start_at, session_end_at) in zip(selected_sessions, map(session_window, selected_sessions))
+            ]
+            booking_docs = [booking.model_dump() for booking in bookings]
+            
+            ledger_entry = None
+            if credits_used > 0:
+                ledger_entry = CreditLedger(
+                    user_id=current_user["id"],
+                    delta=-credits_used,
+                    reason="booking"
+                ).model_dump()
+            
+            try:
+                await self.booking_repo.reserve_and_create_bookings(
+                    booking_docs,
+                    user_id=current_user["id"],
+                    credits=credits_used,
+                    ledger_entry=ledger_entry
+                )
+            except SeatUnavailableError:
+                full = await self.session_repo.get_full_sessions([s["id"] for s in selected_sessions])
+                session_date = full[0].get("date") if full else None
+                raise HTTPException(status_code=400, detail=f"Failed to reserve seat for session on {session_date}")
+            except InsufficientCreditsError:
+                raise HTTPException(status_code=400, detail="Insufficient credits")
+            
+            booking_ids = [booking.id for booking in bookings]
+            
+            for booking_doc in booking_docs:
+                await self.partner_repo.record_booking(listing.get("partner_id"), booking_doc)
+            
+            # AUTO-GENERATE INVOICE for each booking
+            invoice_numbers = []
+            partner_name = None
+            for index, (session, booking) in enumerate(zip(selected_sessions, bookings)):
                 try:
                     logging.info(f"Starting invoice generation for plan booking {booking.id}")
                     
                     # Generate invoice number
                     today = datetime.now(timezone.utc)
                     date_str = today.strftime("%Y%m%d")
-                    count = await self.invoice_repo.generate_invoice_number(date=date_str)
-                    invoice_number = f"INV-{date_str}-{str(count + 1).zfill(4)}"
+                    # Claim numbers for the remaining sessions in one counter round trip
+                    if not invoice_numbers:
+                        remaining = len(bookings) - index
+                        invoice_numbers = await self.invoice_repo.allocate_invoice_numbers(date=date_str, count=remaining)
+                    invoice_number = invoice_numbers.pop(0)
                     
                     # Get partner name
-                    filter={ "name": 1, "business_name": 1}
-                    partner = await self.auth_repo.find_user_by_id(id=listing.get("partner_id"), filter=filter)
-                    
-                    partner_name = partner.get("business_name", partner.get("name", "")) if partner else ""
+                    if partner_name is None:
+                        filter={ "name": 1, "business_name": 1}
+                        partner = await self.auth_repo.find_user_by_id(id=listing.get("partner_id"), filter=filter)
+                        
+                        partner_name = partner.get("business_name", partner.get("name", "")) if partner else ""
                     
                     # Get session date
                     session_date = session.get("start_at") if "start_at" in session else datetime.now(timezone.utc)
@@ -715,15 +745,32 @@ class BookingService:
                 raise HTTPException(status_code=403, detail="Access denied")
             
             bookings = await self.booking_repo.find_bookings(id=current_user["id"])
-            
+
+            # Batch-load every referenced listing and session, then join in memory
+            listing_ids = list({b["listing_id"] for b in bookings if b.get("listing_id")})
+            # Bookings carrying session_start_at need no session read
+            session_ids = list({b["session_id"] for b in bookings if b.get("session_id") and not b.get("session_start_at")})
+            listing_filter = {"id": 1, "title": 1, "media": 1}
+            listings = await self.listing_repo.get_listings_by_ids(listing_ids=listing_ids, data_filter=listing_filter) if listing_ids else []
+            sessions = await self.session_repo.get_sessions_by_ids(session_ids=session_ids) if session_ids else []
+            listing_map = {l["id"]: l for l in listings}
+            session_map = {s["id"]: s for s in sessions}
+
             # Enrich with listing and session
             for booking in bookings:
-                listing = await self.listing_repo.get_listing_by_id(listing_id=booking["listing_id"])
+                listing = listing_map.get(booking.get("listing_id"))
                 if listing:
                     booking["listing_title"] = listing["title"]
                     booking["listing_media"] = listing.get("media", [])
-                
-                session = await self.session_repo.get_session_by_id(session_id=booking["session_id"])
+
+                if booking.get("session_start_at"):
+                    booking["session_start"] = booking["session_start_at"]
+                    booking["session_end"] = booking.get("session_end_at")
+                    booking["session_date"] = booking["session_start_at"]
+                    booking["session_time"] = booking["session_start_at"].strftime("%I:%M %p")
+                    continue
+
+                session = session_map.get(booking.get("session_id"))
                 if session:
                     # Handle both old (start_at) and new (date/time) session structures
                     if "start_at" in session:
@@ -797,45 +844,49 @@ class BookingService:
         if booking.get("is_trial", False):
             raise HTTPException(status_code=400, detail="Trial bookings cannot be canceled")
         
-        # Get session to check timing
-        session = await self.session_repo.get_session_by_id(session_id=booking["session_id"])
-        if not session:
-            raise HTTPException(status_code=404, detail="Session not found")
-        
-        # Handle both old (start_at) and new (date/time) session structures
         now = datetime.now(timezone.utc)
-        
-        if "start_at" in session:
-            session_start = session["start_at"]
+        if booking.get("session_start_at"):
+            # Denormalized onto the booking, so no session read is needed
+            session_start = booking["session_start_at"]
             if session_start.tzinfo is None:
                 session_start = session_start.replace(tzinfo=timezone.utc)
-        elif "date" in session and "time" in session:
-            # Convert date/time to datetime
-            try:
-                session_date = datetime.fromisoformat(session["date"])
-                session_time_str = session["time"]
+        else:
+            # Older bookings: get session to check timing
+            session = await self.session_repo.get_session_by_id(session_id=booking["session_id"])
+            if not session:
+                raise HTTPException(status_code=404, detail="Session not found")
+        
+            if "start_at" in session:
+                session_start = session["start_at"]
+                if session_start.tzinfo is None:
+                    session_start = session_start.replace(tzinfo=timezone.utc)
+            elif "date" in session and "time" in session:
+                # Convert date/time to datetime
+                try:
+                    session_date = datetime.fromisoformat(session["date"])
+                    session_time_str = session["time"]
                 
-                # Parse time
-                if isinstance(session_time_str, str):
-                    time_parts = session_time_str.split(':')
-                    hour = int(time_parts[0])
-                    minute = int(time_parts[1]) if len(time_parts) > 1 else 0
-                else:
-                    hour = session_time_str.hour if hasattr(session_time_str, 'hour') else 0
-                    minute = session_time_str.minute if hasattr(session_time_str, 'minute') else 0
+                    # Parse time
+                    if isinstance(session_time_str, str):
+                        time_parts = session_time_str.split(':')
+                        hour = int(time_parts[0])
+                        minute = int(time_parts[1]) if len(time_parts) > 1 else 0
+                    else:
+                        hour = session_time_str.hour if hasattr(session_time_str, 'hour') else 0
+                        minute = session_time_str.minute if hasattr(session_time_str, 'minute') else 0
                 
-                session_start = session_date.replace(
-                    hour=hour,
-                    minute=minute,
-                    second=0,
-                    microsecond=0,
-                    tzinfo=timezone.utc
-                )
-            except Exception as e:
-                logging.error(f"Error parsing session date/time: {e}")
-                raise HTTPException(status_code=500, detail="Invalid session date/time format")
-        else:
-            raise HTTPException(status_code=500, detail="Session missing date/time information")
+                    session_start = session_date.replace(
+                        hour=hour,
+                        minute=minute,
+                        second=0,
+                        microsecond=0,
+                        tzinfo=timezone.utc
+                    )
+                except Exception as e:
+                    logging.error(f"Error parsing session date/time: {e}")
+                    raise HTTPException(status_code=500, detail="Invalid session date/time format")
+            else:
+                raise HTTPException(status_code=500, detail="Session missing date/time information")
         
         # Calculate hours before session starts
         hours_before = (session_start - now).total_seconds() / 3600
@@ -887,6 +938,10 @@ class BookingService:
                     "payout_eligible": False
                 }
         await self.booking_repo.update_booking(booking_id=booking_id, update_data=update_data)
+
+        listing = await self.listing_repo.get_listing_by_id(booking["listing_id"])
+        if listing:
+            await self.partner_repo.record_booking_status(listing["partner_id"], booking, "canceled")
         
         return {
             "message": f"Booking canceled successfully with {refund_pct}% refund",
@@ -1002,6 +1057,8 @@ class BookingService:
             # Update booking with reschedule count
             update_data={
                         "session_id": new_session_id,
+                        "session_start_at": session_start,
+                        "session_end_at": session_window(new_session)[1],
                         "rescheduled_at": datetime.now(timezone.utc),
                         "rescheduled_from": booking["session_id"]
                     }
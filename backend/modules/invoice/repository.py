@@ -1,9 +1,58 @@
+from typing import List
+
+from pymongo import ReturnDocument
+
 from backend.core.database import mongodb
 
+# Days whose counter has been seeded from existing invoices by this process
+_seeded_days = set()
+
+
 class InvoiceRepository:
+    async def _seed_counter(self, date):
+        """Raise the day's counter to the highest number already issued.
+
+        Only needed for days that had invoices before the counter existed; once
+        the counter document exists it is the only source of truth. The highest
+        number is taken from the numeric suffix, since string order breaks once
+        a day passes 9999 invoices. ``$max`` never moves the counter backwards,
+        so this is safe to race.
+        """
+        if date in _seeded_days:
+            return
+        if await mongodb.db.counters.find_one({"_id": f"invoice:{date}"}, {"_id": 1}):
+            _seeded_days.add(date)
+            return
+        rows = await mongodb.db.invoices.aggregate([
+            {"$match": {"invoice_number": {"$regex": f"^INV-{date}-"}}},
+            {"$group": {
+                "_id": None,
+                "issued": {"$max": {"$toInt": {"$arrayElemAt": [{"$split": ["$invoice_number", "-"]}, -1]}}}
+            }}
+        ]).to_list(1)
+        if rows and rows[0]["issued"]:
+            await mongodb.db.counters.update_one(
+                {"_id": f"invoice:{date}"},
+                {"$max": {"seq": rows[0]["issued"]}},
+                upsert=True
+            )
+        _seeded_days.add(date)
+
+    async def allocate_invoice_numbers(self, date, count=1) -> List[str]:
+        """Atomically claim ``count`` consecutive invoice numbers for ``date``."""
+        await self._seed_counter(date)
+        counter = await mongodb.db.counters.find_one_and_update(
+            {"_id": f"invoice:{date}"},
+            {"$inc": {"seq": count}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        last = counter["seq"]
+        return [f"INV-{date}-{str(seq).zfill(4)}" for seq in range(last - count + 1, last + 1)]
+
     async def generate_invoice_number(self, date):
-        return await mongodb.db.invoices.count_documents({
-                    "invoice_number": {"$regex": f"^INV-{date}-"}
-                })
+        numbers = await self.allocate_invoice_numbers(date=date)
+        return numbers[0]
+
     async def add_invoice(self, data):
-        return await mongodb.db.invoices.insert_one(data)
\ No newline at end of file
+        return await mongodb.db.invoices.insert_one(data)
@@ -0,0 +1,41 @@
+from backend.core.cache import TTLCache, SWRCache
+from backend.core.config import SEARCH_CACHE_TTL_SECONDS, SEARCH_CACHE_STALE_SECONDS, SEARCH_CACHE_MAX_BYTES
+from backend.core.config import SCHEDULE_CACHE_TTL_SECONDS, SCHEDULE_CACHE_STALE_SECONDS, SCHEDULE_CACHE_MAX_BYTES
+from backend.core.metrics import register_metrics
+
+
+# Match counts per filter combination, so deep pages skip the $facet count
+search_total_cache = TTLCache(maxsize=1024, ttl=30)
+register_metrics("search_total_cache", search_total_cache.stats)
+
+# Formatted search responses keyed on normalized parameters, tagged by listing id
+search_result_cache = SWRCache(
+    max_bytes=SEARCH_CACHE_MAX_BYTES,
+    ttl=SEARCH_CACHE_TTL_SECONDS,
+    stale_ttl=SEARCH_CACHE_STALE_SECONDS
+)
+register_metrics("search_result_cache", search_result_cache.stats)
+
+# Session schedules (times, prices, plan info) per listing and date window, tagged by
+# listing id; live seat counts come from sessions.cache.seat_overlay at response time
+schedule_cache = SWRCache(
+    max_bytes=SCHEDULE_CACHE_MAX_BYTES,
+    ttl=SCHEDULE_CACHE_TTL_SECONDS,
+    stale_ttl=SCHEDULE_CACHE_STALE_SECONDS
+)
+register_metrics("schedule_cache", schedule_cache.stats)
+
+# Listing fields that decide whether (and where) a listing shows up in search
+SEARCH_MEMBERSHIP_FIELDS = {"status", "approval_status", "is_live", "trial_available", "rating",
+                            "category", "age_min", "age_max", "is_online", "venue_id", "location"}
+
+
+def invalidate_listing(listing_id, changed_fields=()):
+    """Drop cached search pages showing ``listing_id``; clear everything when membership may change."""
+    # Schedules fall back to the listing's base price
+    schedule_cache.invalidate_tag(listing_id)
+    if SEARCH_MEMBERSHIP_FIELDS.intersection(changed_fields):
+        search_result_cache.clear()
+        search_total_cache.clear()
+    else:
+        search_result_cache.invalidate_tag(listing_id)
@@ -1,4 +1,6 @@
 from backend.core.database import mongodb
+from backend.core.dataloader import get_loader, clear_loader, batch_find
+from backend.modules.listing.cache import invalidate_listing
 
 class ListingRepository:
     async def get_categories(self):
@@ -30,60 +32,76 @@ class ListingRepository:
         if not update_query:
             return False
         
-        return await mongodb.db.listing.update_one(query, update_query)
+        result = await mongodb.db.listing.update_one(query, update_query)
+        clear_loader("listings.id", listing_id)
+        invalidate_listing(listing_id, data.keys() if isinstance(data, dict) else ())
+        return result
     
     async def get_listing_by_id(self, listing_id, data_filter=None):
+        if not data_filter:
+            loader = get_loader("listings.id", batch_find("listings", "id"))
+            if loader:
+                return await loader.load(listing_id)
         projection = {"_id": 0}
         if data_filter:
             projection.update(data_filter)
         return await mongodb.db.listings.find_one({"id": listing_id}, projection)
     
+    async def get_listings_by_ids(self, listing_ids, data_filter=None):
+        projection = {"_id": 0}
+        if data_filter:
+            projection.update(data_filter)
+        return await mongodb.db.listings.find({"id": {"$in": listing_ids}}, projection).to_list(None)
+    
     
     async def search_pipeline(
         self, city, age, category,
         is_online, trial,
-        skip, limit
+        skip, limit,
+        after=None, with_total=False,
+        near=None, sort="relevance"
     ):
-        pipeline = []
+        """Run the listing search.
 
-        pipeline.append({
-            "$match": {
-                "status": "active",
-                "approval_status": "approved",
-                "is_live": True
-            }
-        })
+        ``after`` is the sort key of the last row already seen, either
+        (trial_available, rating, id) or (distance_m, id) for ``sort="distance"``;
+        when given, paging is keyset-based and ``skip`` is ignored.
+        ``near`` is (lng, lat, radius_km) and restricts results with ``$geoNear``
+        on the denormalized listing ``location``, adding ``distance_m`` to each row.
+        With ``with_total`` the exact match count is computed in the same
+        round trip through ``$facet``.
+        """
+        match = {
+            "status": "active",
+            "approval_status": "approved",
+            "is_live": True
+        }
 
         if age:
-            pipeline.append({
-                "$match": {
-                    "age_min": {"$lte": age},
-                    "age_max": {"$gte": age}
-                }
-            })
+            match["age_min"] = {"$lte": age}
+            match["age_max"] = {"$gte": age}
         
         if category:
-            pipeline.append({"$match": {"category": category}})
+            match["category"] = category
 
         if is_online is not None:
-            pipeline.append({"$match": {"is_online": is_online}})
+            match["is_online"] = is_online
 
         if trial:
-            pipeline.append({"$match": {"trial_available": True}})
+            match["trial_available"] = True
 
-        pipeline.append({
-            "$sort": {
-                "trial_available": -1,
-                "rating": -1
-            }
-        })
+        by_distance = near is not None and sort == "distance"
 
-        pipeline.extend([
-            {"$skip": skip},
-            {"$limit": limit}
-        ])
+        page = []
+        if after and by_distance:
+            page.append({"$match": self._after_distance_key(*after)})
+        elif after:
+            page.append({"$match": self._after_sort_key(*after)})
+        elif skip:
+            page.append({"$skip": skip})
+        page.append({"$limit": limit})
 
-        pipeline.append({
+        page.append({
             "$lookup": {
                 "from": "partners",
                 "localField": "partner_id",
@@ -92,7 +110,7 @@ class ListingRepository:
             }
         })
 
-        pipeline.append({
+        page.append({
             "$lookup": {
                 "from": "venues",
                 "localField": "venue_id",
@@ -101,5 +119,89 @@ class ListingRepository:
             }
         })
 
-        return await mongodb.db.listings.aggregate(pipeline).to_list(None)
-    
+        if near is not None:
+            lng, lat, radius_km = near
+            geo_near = {
+                "near": {"type": "Point", "coordinates": [lng, lat]},
+                "distanceField": "distance_m",
+                "maxDistance": radius_km * 1000,
+                "spherical": True,
+                "key": "location",
+                "query": match
+            }
+            if after and by_distance:
+                geo_near["minDistance"] = after[0]
+            pipeline = [{"$geoNear": geo_near}]
+        else:
+            pipeline = [{"$match": match}]
+
+        if by_distance:
+            pipeline.append({"$sort": {"distance_m": 1, "id": 1}})
+        else:
+            pipeline.append({"$sort": {"trial_available": -1, "rating": -1, "id": 1}})
+
+        if not with_total:
+            pipeline.extend(page)
+            items = await mongodb.db.listings.aggregate(pipeline).to_list(None)
+            return {"items": items, "total": None}
+
+        pipeline.append({
+            "$facet": {
+                "items": page,
+                "total": [{"$count": "count"}]
+            }
+        })
+        result = await mongodb.db.listings.aggregate(pipeline).to_list(1)
+        facet = result[0] if result else {"items": [], "total": []}
+        total = facet["total"][0]["count"] if facet["total"] else 0
+        return {"items": facet["items"], "total": total}
+
+    @staticmethod
+    def _after_sort_key(trial_available, rating, listing_id):
+        """Match rows sorting strictly after the given key under {trial_available: -1, rating: -1, id: 1}."""
+        def below(field, value):
+            # Descending order: smaller values, then null/missing, come next
+            if value is None:
+                return None
+            return {"$or": [{field: {"$lt": value}}, {field: None}]}
+
+        branches = []
+        trial_below = below("trial_available", trial_available)
+        if trial_below:
+            branches.append(trial_below)
+        rating_below = below("rating", rating)
+        if rating_below:
+            branches.append({"trial_available": trial_available, **rating_below})
+        branches.append({"trial_available": trial_available, "rating": rating, "id": {"$gt": listing_id}})
+        return {"$or": branches}
+
+    @staticmethod
+    def _after_distance_key(distance_m, listing_id):
+        """Match rows sorting strictly after the given key under {distance_m: 1, id: 1}."""
+        return {"$or": [
+            {"distance_m": {"$gt": distance_m}},
+            {"distance_m": distance_m, "id": {"$gt": listing_id}}
+        ]}
+
+    async def sync_venue_locations(self, listing_ids=None):
+        """Copy venue lat/lng onto listings as a GeoJSON ``location`` for $geoNear search."""
+        query = {"venue_id": {"$exists": True, "$ne": None}}
+        if listing_ids is not None:
+            query["id"] = {"$in": listing_ids}
+
+        pipeline = [
+            {"$match": query},
+            {"$lookup": {
+                "from": "venues",
+                "localField": "venue_id",
+                "foreignField": "id",
+                "as": "venue"
+            }},
+            {"$unwind": "$venue"},
+            {"$match": {"venue.lat": {"$type": "number"}, "venue.lng": {"$type": "number"}}},
+            {"$project": {
+                "location": {"type": {"$literal": "Point"}, "coordinates": ["$venue.lng", "$venue.lat"]}
+            }},
+            {"$merge": {"into": "listings", "on": "_id", "whenMatched": "merge", "whenNotMatched": "discard"}}
+        ]
+        await mongodb.db.listings.aggregate(pipeline).to_list(None)
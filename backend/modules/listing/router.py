@@ -29,6 +29,8 @@ async def search_listings(
     radius_km: float = 10,
     skip: int = 0,
     limit: int = 60,
+    cursor: Optional[str] = None,
+    sort: str = "relevance",
     listing_service: ListingService = Depends(get_listing_service)
 ):
      return await listing_service.search_listings(
@@ -42,7 +44,9 @@ async def search_listings(
         lng=lng,
         radius_km=radius_km,
         skip=skip,
-        limit=limit
+        limit=limit,
+        cursor=cursor,
+        sort=sort
     )
 
 @list_router.get("/my")
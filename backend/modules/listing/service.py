@@ -4,6 +4,7 @@ from typing import Optional
 from datetime import datetime, timezone, timedelta
 import os
 import logging
+import time
 import uuid
 from backend.modules.auth.repository import AuthRepository
 from backend.modules.wallet.repository import WalletRepository
@@ -11,10 +12,21 @@ from backend.modules.users.repository import UserRepository
 from backend.modules.listing.repository import ListingRepository
 from backend.modules.partner.repository import PartnerRepository
 from backend.modules.sessions.repository import SessionRepository
+from backend.modules.sessions.utility import session_id_for
 from backend.core.email_service.email_instance import email_service
-from backend.modules.listing.utility import calculate_distance_km, format_distance
+from backend.modules.listing.utility import format_distance
+from backend.modules.listing.utility import encode_search_cursor, decode_search_cursor
+from backend.modules.listing.cache import search_total_cache, search_result_cache, schedule_cache
+from backend.modules.sessions.cache import seat_overlay
 
 
+def _near_key(near):
+    """``near`` at ~100m precision, so nearby "near me" searches share a cache key"""
+    if near is None:
+        return None
+    lng, lat, radius_km = near
+    return (round(lng, 3), round(lat, 3), radius_km)
+
 
 class ListingService:
     def __init__(self, 
@@ -37,12 +49,52 @@ class ListingService:
         return categories
     
     async def search_listings(self,city, age, category,date,is_online,trial,
-                            lat,lng,radius_km,skip,limit):
-        listings = await self.repo.search_pipeline(
+                            lat,lng,radius_km,skip,limit,cursor=None,sort="relevance"):
+        if sort not in ("relevance", "distance"):
+            raise HTTPException(status_code=400, detail="sort must be 'relevance' or 'distance'")
+
+        near = None
+        if lat is not None and lng is not None:
+            near = (lng, lat, radius_km)
+        elif sort == "distance":
+            raise HTTPException(status_code=400, detail="lat and lng are required to sort by distance")
+
+        after = None
+        if cursor:
+            try:
+                after = decode_search_cursor(cursor, sort)
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+
+        # Only the keys are rounded; the query gets the exact point and radius
+        cache_key = (city, age, category, is_online, bool(trial), _near_key(near), sort, cursor or skip, limit)
+        return await search_result_cache.get_or_load(
+            cache_key,
+            lambda: self._run_search(city, age, category, is_online, trial, near, sort, after, skip, limit),
+            tags=lambda result: [listing["id"] for listing in result["listings"]]
+        )
+
+    async def _run_search(self, city, age, category, is_online, trial, near, sort, after, skip, limit):
+        total_key = (city, age, category, is_online, bool(trial), _near_key(near))
+        total = search_total_cache.get(total_key)
+
+        # Fetch one extra row to know whether another page exists
+        result = await self.listing_repo.search_pipeline(
             city, age, category,
             is_online, trial,
-            skip, limit
+            skip, limit + 1,
+            after=after, with_total=total is None,
+            near=near, sort=sort
         )
+        if total is None:
+            total = result["total"]
+            search_total_cache.set(total_key, total)
+
+        listings = result["items"]
+        has_more = len(listings) > limit
+        listings = listings[:limit]
+        next_cursor = encode_search_cursor(listings[-1], sort) if has_more else None
+
         for listing in listings:
             listing.pop("_id", None)
 
@@ -59,8 +111,8 @@ class ListingService:
             venue.pop("_id", None)
             listing["venue"] = venue
 
-            if lat and lng and venue.get("lat") and venue.get("lng"):
-                distance = calculate_distance_km(lat, lng, venue["lat"], venue["lng"])
+            if listing.get("distance_m") is not None:
+                distance = listing["distance_m"] / 1000
                 listing["distance_km"] = round(distance, 1)
                 listing["distance_text"] = format_distance(distance)
             
@@ -69,7 +121,8 @@ class ListingService:
 
         return {
             "listings": listings,
-            "total": len(listings)
+            "total": total,
+            "next_cursor": next_cursor
         }
     
     async def get_my_listings(self, current_user):
@@ -134,133 +187,58 @@ class ListingService:
         to_date: Optional[str]
     ):
         try:
-            # Get the listing to get base price
-            data_filter = {"base_price_inr": 1}
-            listing = await self.listing_repo.get_listing_by_id(listing_id, data_filter)
-            base_price = listing.get("base_price_inr", 1000) if listing else 1000
-            
-            # Get current date for filtering
-            today = datetime.now(timezone.utc).date()
-            today_str = today.isoformat()
-            
+            # Sessions carry start_at/end_at (see migrations.session_times), so the
+            # requested days map to one listing_id+status+start_at range scan
+            now = datetime.now(timezone.utc)
+            start_day = datetime.fromisoformat(from_date).date() if from_date else now.date()
             # Default to 90 days ahead if no to_date specified
-            if not to_date:
-                default_end_date = today + timedelta(days=90)
-                to_date = default_end_date.isoformat()
-            
-            # Query both old and new session structures
-            base_query = {"listing_id": listing_id, "status": "scheduled"}
-            
-            # Get sessions with new structure (date/time fields) - PRIORITIZE THESE
-            new_sessions_query = {**base_query, "date": {"$exists": True}}
-            if from_date:
-                new_sessions_query["date"] = {"$gte": from_date}
-            else:
-                new_sessions_query["date"] = {"$gte": today_str}
-            
-            if to_date:
-                if "date" in new_sessions_query and isinstance(new_sessions_query["date"], dict):
-                    new_sessions_query["date"]["$lte"] = to_date
-                else:
-                    new_sessions_query["date"] = {"$lte": to_date}
-            
-            new_sessions = await db.sessions.find(new_sessions_query, {"_id": 0}).to_list(1000)
-            
-            # Get sessions with old structure (start_at field) ONLY if no new sessions found
-            old_sessions = []
-            if len(new_sessions) < 100:  # Get old sessions as fallback if not many new sessions
-                old_sessions_query = {**base_query, "start_at": {"$exists": True}}
-                if from_date:
-                    old_sessions_query["start_at"] = {"$gte": datetime.fromisoformat(from_date)}
-                else:
-                    old_sessions_query["start_at"] = {"$gte": datetime.now(timezone.utc)}
-                    
-                if to_date:
-                    if "start_at" in old_sessions_query and isinstance(old_sessions_query["start_at"], dict):
-                        old_sessions_query["start_at"]["$lte"] = datetime.fromisoformat(to_date)
-                    else:
-                        old_sessions_query["start_at"] = {"$lte": datetime.fromisoformat(to_date)}
-                
-                old_sessions = await db.sessions.find(old_sessions_query, {"_id": 0}).limit(1000).to_list(1000)
-            
-            # Normalize and combine sessions
+            end_day = datetime.fromisoformat(to_date).date() if to_date else now.date() + timedelta(days=90)
+            range_start = datetime.combine(start_day, datetime.min.time(), tzinfo=timezone.utc)
+            range_end = datetime.combine(end_day + timedelta(days=1), datetime.min.time(), tzinfo=timezone.utc)
+
+            schedule = await schedule_cache.get_or_load(
+                (listing_id, range_start, range_end),
+                lambda: self._load_listing_schedule(listing_id, range_start, range_end),
+                tags=lambda value: (listing_id,)
+            )
+
+            # Static schedule from the cache, live seat counts from the overlay
+            seats_booked = await seat_overlay.seats_booked([session["id"] for session in schedule])
             all_sessions = []
-            
-            # Process new structure sessions (with pricing)
-            for session in new_sessions:
-                # Convert date/time to datetime for sorting
-                try:
-                    session_date = datetime.fromisoformat(session["date"])
-                    session_time_str = session["time"]
-                    
-                    # Parse time
-                    if isinstance(session_time_str, str):
-                        time_parts = session_time_str.split(':')
-                        hour = int(time_parts[0])
-                        minute = int(time_parts[1]) if len(time_parts) > 1 else 0
-                    else:
-                        hour = session_time_str.hour if hasattr(session_time_str, 'hour') else 0
-                        minute = session_time_str.minute if hasattr(session_time_str, 'minute') else 0
-                    
-                    # Combine date and time
-                    session_datetime = session_date.replace(
-                        hour=hour,
-                        minute=minute,
-                        second=0,
-                        microsecond=0,
-                        tzinfo=timezone.utc
-                    )
-                    
-                    session["start_at"] = session_datetime
-                    seats_booked = session.get("seats_booked", 0)
-                    session["seats_available"] = session["seats_total"] - seats_booked
-                    
-                    # Ensure price_inr is present
-                    if "price_inr" not in session or session["price_inr"] is None:
-                        session["price_inr"] = base_price
-                    
-                    # Add is_bookable flag
-                    has_seats = session["seats_available"] > 0
-                    is_future = session_datetime > datetime.now(timezone.utc)
-                    session["is_bookable"] = has_seats and is_future
-                    
-                    all_sessions.append(session)
-                except Exception as e:
-                    logging.warning(f"Error processing session {session.get('id')}: {e}")
-                    continue
-            
-            # Process old structure sessions (add pricing from listing base_price)
-            for session in old_sessions:
-                seats_booked = session.get("seats_booked", 0)
-                session["seats_available"] = session["seats_total"] - seats_booked
-                
-                # Add price_inr if missing
-                if "price_inr" not in session:
-                    session["price_inr"] = session.get("price_override_inr") or base_price
-                    session["plan_type"] = "single"
-                    session["plan_name"] = "Single Session"
-                    session["sessions_count"] = 1
-                
-                # Ensure timezone-aware
-                if session["start_at"].tzinfo is None:
-                    session["start_at"] = session["start_at"].replace(tzinfo=timezone.utc)
-                
-                # Add is_bookable flag
-                has_seats = session["seats_available"] > 0
-                is_future = session["start_at"] > datetime.now(timezone.utc)
-                session["is_bookable"] = has_seats and is_future
-                
+            for cached in schedule:
+                session = dict(cached)
+                session["seats_booked"] = seats_booked.get(session["id"], session.get("seats_booked", 0))
+                session["seats_available"] = session["seats_total"] - session["seats_booked"]
+                session["is_bookable"] = session["seats_available"] > 0 and session["start_at"] > now
                 all_sessions.append(session)
             
-            # Sort by start_at
-            all_sessions.sort(key=lambda x: x["start_at"])
-            
             return {"sessions": all_sessions}
         except Exception as e:
             # CRITICAL: Return empty array instead of error object to prevent frontend crashes
             logging.error(f"Error in get_listing_sessions for listing {listing_id}: {e}")
             return {"sessions": []}
 
+    async def _load_listing_schedule(self, listing_id, range_start, range_end):
+        """Sessions in the window with prices resolved; seat fields are filled per request."""
+        listing = await self.listing_repo.get_listing_by_id(listing_id, {"base_price_inr": 1})
+        base_price = listing.get("base_price_inr", 1000) if listing else 1000
+
+        sessions = await self.session_repo.get_listing_sessions_between(listing_id, range_start, range_end)
+        for session in sessions:
+            # Stored datetimes come back naive (UTC)
+            if session["start_at"].tzinfo is None:
+                session["start_at"] = session["start_at"].replace(tzinfo=timezone.utc)
+
+            # Ensure price_inr is present
+            if session.get("price_inr") is None:
+                session["price_inr"] = session.get("price_override_inr") or base_price
+                if "date" not in session:
+                    # Legacy one-off sessions are sold as single sessions
+                    session["plan_type"] = "single"
+                    session["plan_name"] = "Single Session"
+                    session["sessions_count"] = 1
+        return sessions
+
     async def get_listing_plans(self, listing_id):
         try:
             listing = await self.listing_repo.get_listing_by_id(listing_id)
@@ -393,6 +371,13 @@ class ListingService:
 
             await self.listing_repo.update_listing(listing_id, data)
 
+            # Refresh the denormalized geo point when the listing moves venue
+            if "venue_id" in data:
+                await self.listing_repo.sync_venue_locations(listing_ids=[listing_id])
+
+            if "status" in data:
+                await self.partner_repo.refresh_active_listings(listing["partner_id"])
+
         except HTTPException:
             raise  # Re-raise HTTP exceptions
         except Exception as e:
@@ -602,7 +587,8 @@ class ListingService:
             if not batch:
                 raise HTTPException(status_code=404, detail="Batch not found")
             
-            sessions_created = []
+            started = time.perf_counter()
+            session_docs = []
             # Parse start date
             start_date = datetime.fromisoformat(batch["start_date"]).date()
             end_date_limit = start_date + timedelta(weeks=weeks)
@@ -635,7 +621,7 @@ class ListingService:
                     
                     # Create session document
                     session_doc = {
-                        "id": str(uuid.uuid4()),
+                        "id": session_id_for(listing_id, batch_id, session_datetime),
                         "listing_id": listing_id,
                         "batch_id": batch_id,
                         "start_at": session_datetime,
@@ -650,13 +636,23 @@ class ListingService:
                         "original_date": None
                     }
 
-                    await self.session_repo.add_session(session_doc)
-                    sessions_created.append(session_doc["id"])
+                    session_docs.append(session_doc)
                 current_date += timedelta(days=1)
+
+            computed = time.perf_counter()
+            created, skipped = await self.session_repo.add_sessions(session_docs)
+            written = time.perf_counter()
+
+            await self.partner_repo.record_sessions(listing["partner_id"], [s["start_at"] for s in created])
             return {
-                    "message": f"Generated {len(sessions_created)} sessions",
-                    "sessions_count": len(sessions_created),
-                    "batch_id": batch_id
+                    "message": f"Generated {len(created)} sessions",
+                    "sessions_count": len(created),
+                    "sessions_skipped": skipped,
+                    "batch_id": batch_id,
+                    "timings_ms": {
+                        "compute": round((computed - started) * 1000, 1),
+                        "write": round((written - computed) * 1000, 1)
+                    }
                 }
 
         except HTTPException:
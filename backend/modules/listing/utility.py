@@ -24,4 +24,28 @@ def format_distance(distance_km: float) -> str:
     elif distance_km < 10:
         return f"{distance_km:.1f}km away"
     else:
-        return f"{int(distance_km)}km away"
\ No newline at end of file
+        return f"{int(distance_km)}km away"
+
+def encode_search_cursor(listing: dict, sort: str = "relevance") -> str:
+    """Opaque cursor holding the search sort key of the last listing on a page"""
+    import base64
+    import json
+
+    if sort == "distance":
+        key = [sort, listing["distance_m"], listing["id"]]
+    else:
+        key = [sort, listing.get("trial_available"), listing.get("rating"), listing["id"]]
+    return base64.urlsafe_b64encode(json.dumps(key).encode("utf-8")).decode("ascii")
+
+def decode_search_cursor(cursor: str, sort: str = "relevance") -> tuple:
+    """Inverse of encode_search_cursor; raises ValueError on a malformed cursor or sort mismatch"""
+    import base64
+    import json
+
+    try:
+        cursor_sort, *key = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
+    if cursor_sort != sort or len(key) != (2 if sort == "distance" else 3):
+        raise ValueError("Invalid cursor")
+    return tuple(key)
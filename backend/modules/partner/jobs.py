@@ -0,0 +1,34 @@
+import asyncio
+import logging
+import uuid
+
+from backend.core.database import mongodb
+from backend.core.leases import acquire_lease
+from backend.modules.partner.repository import PartnerRepository
+
+
+async def reconcile_partner_stats() -> int:
+    """Rebuild every partner's dashboard counters from the source collections."""
+    repo = PartnerRepository()
+    rebuilt = 0
+    async for partner in mongodb.db.partners.find({}, {"_id": 0, "id": 1}):
+        try:
+            await repo.rebuild_partner_stats(partner["id"])
+            rebuilt += 1
+        except Exception as e:
+            logging.error(f"Failed to rebuild stats for partner {partner['id']}: {e}")
+    return rebuilt
+
+
+async def run_partner_stats_reconciler(interval_seconds: int):
+    """Periodically correct drift in partner_stats (started from main.lifespan in every worker; one runs it)."""
+    holder = str(uuid.uuid4())
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            if not await acquire_lease("partner_stats_reconciler", holder, 2 * interval_seconds):
+                continue
+            rebuilt = await reconcile_partner_stats()
+            logging.info(f"Reconciled stats for {rebuilt} partners")
+        except Exception as e:
+            logging.error(f"Partner stats reconciliation failed: {e}")
@@ -1,5 +1,202 @@
+import logging
+from collections import Counter
+from datetime import datetime, timezone
+
+from pymongo.errors import DuplicateKeyError
+
 from backend.core.database import mongodb
+from backend.core.dataloader import get_loader, batch_find
+
+# Booking statuses that count towards partner revenue
+REVENUE_STATUSES = ("confirmed", "attended")
+# Months of revenue history kept on the stats document
+REVENUE_MONTHS = 12
+# Rebuild attempts before giving up to concurrent writes until the next run
+REBUILD_ATTEMPTS = 3
+
+
+def _utc(dt: datetime) -> datetime:
+    return dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt
+
+
+def _month_key(dt: datetime) -> str:
+    return _utc(dt).strftime("%Y-%m")
+
+
+def _hour_key(dt: datetime) -> str:
+    return _utc(dt).strftime("%Y%m%d%H")
+
 
 class PartnerRepository:
     async def get_partner_by_id(self, id):
-        return await mongodb.db.partners.find_one({"owner_user_id": id}, {"_id": 0})
\ No newline at end of file
+        loader = get_loader("partners.owner_user_id", batch_find("partners", "owner_user_id"))
+        if loader:
+            return await loader.load(id)
+        return await mongodb.db.partners.find_one({"owner_user_id": id}, {"_id": 0})
+
+    async def get_financial_totals(self, partner_id):
+        """Booking and payout totals for the financial summary, summed in MongoDB."""
+        listing_ids = await mongodb.db.listings.distinct("id", {"partner_id": partner_id})
+        bookings = await mongodb.db.bookings.aggregate([
+            {"$match": {
+                "listing_id": {"$in": listing_ids},
+                "booking_status": {"$in": list(REVENUE_STATUSES)}
+            }},
+            {"$group": {
+                "_id": None,
+                "total_bookings": {"$sum": 1},
+                # Only attended, payout-eligible bookings have been earned
+                "gross_earnings": {"$sum": {"$cond": [
+                    {"$and": [
+                        {"$eq": ["$booking_status", "attended"]},
+                        {"$eq": ["$payout_eligible", True]}
+                    ]},
+                    "$total_inr",
+                    0
+                ]}}
+            }}
+        ]).to_list(1)
+
+        payouts = await mongodb.db.payout_requests.aggregate([
+            {"$match": {"partner_id": partner_id, "status": {"$in": ["pending", "completed"]}}},
+            {"$group": {"_id": "$status", "total": {"$sum": "$amount_inr"}}}
+        ]).to_list(None)
+        payout_totals = {row["_id"]: row["total"] for row in payouts}
+
+        return {
+            "has_listings": bool(listing_ids),
+            "total_bookings": bookings[0]["total_bookings"] if bookings else 0,
+            "gross_earnings": bookings[0]["gross_earnings"] if bookings else 0,
+            "pending_payouts": payout_totals.get("pending", 0),
+            "completed_payouts": payout_totals.get("completed", 0)
+        }
+
+    # ---- dashboard counters (partner_stats) ----
+    #
+    # One document per partner, kept current with $inc from the write paths.
+    # Revenue is bucketed by booking month and upcoming sessions by start hour,
+    # so "this month" and "from now on" are answered from the document alone.
+    # Updates never upsert: a missing document is rebuilt from source on read,
+    # and rebuild_partner_stats also runs periodically to correct any drift.
+    # Every write bumps ``version``; a rebuild only replaces the counters if the
+    # version is unchanged since before it read the sources, so it cannot
+    # overwrite an $inc that landed while it was counting.
+
+    async def get_partner_stats(self, partner_id):
+        stats = await mongodb.db.partner_stats.find_one({"partner_id": partner_id}, {"_id": 0})
+        if not stats:
+            stats = await self.rebuild_partner_stats(partner_id)
+
+        now = datetime.now(timezone.utc)
+        current_hour = _hour_key(now)
+        return {
+            "total_bookings": stats.get("total_bookings", 0),
+            "revenue_this_month": stats.get("revenue_by_month", {}).get(_month_key(now), 0.0),
+            "active_listings": stats.get("active_listings", 0),
+            "upcoming_sessions": sum(
+                count for hour, count in stats.get("sessions_by_hour", {}).items() if hour >= current_hour
+            )
+        }
+
+    async def record_booking(self, partner_id, booking: dict):
+        inc = {"total_bookings": 1}
+        if booking.get("booking_status") in REVENUE_STATUSES:
+            booked_at = booking.get("booked_at") or datetime.now(timezone.utc)
+            inc[f"revenue_by_month.{_month_key(booked_at)}"] = booking.get("total_inr", 0)
+        inc["version"] = 1
+        return await mongodb.db.partner_stats.update_one({"partner_id": partner_id}, {"$inc": inc})
+
+    async def record_booking_status(self, partner_id, booking: dict, new_status: str):
+        """Move a booking's amount in or out of revenue when its status changes."""
+        was_revenue = booking.get("booking_status") in REVENUE_STATUSES
+        is_revenue = new_status in REVENUE_STATUSES
+        if was_revenue == is_revenue or not booking.get("booked_at"):
+            return None
+        amount = booking.get("total_inr", 0)
+        return await mongodb.db.partner_stats.update_one(
+            {"partner_id": partner_id},
+            {"$inc": {f"revenue_by_month.{_month_key(booking['booked_at'])}": amount if is_revenue else -amount, "version": 1}}
+        )
+
+    async def record_sessions(self, partner_id, start_ats, delta=1):
+        """Add (or with ``delta=-1`` remove) scheduled sessions starting at ``start_ats``."""
+        current_hour = _hour_key(datetime.now(timezone.utc))
+        buckets = Counter(_hour_key(start) for start in start_ats if start and _hour_key(start) >= current_hour)
+        if not buckets:
+            return None
+        return await mongodb.db.partner_stats.update_one(
+            {"partner_id": partner_id},
+            {"$inc": {**{f"sessions_by_hour.{hour}": count * delta for hour, count in buckets.items()}, "version": 1}}
+        )
+
+    async def refresh_active_listings(self, partner_id):
+        active_listings = await mongodb.db.listings.count_documents({"partner_id": partner_id, "status": "active"})
+        return await mongodb.db.partner_stats.update_one(
+            {"partner_id": partner_id},
+            {"$set": {"active_listings": active_listings}, "$inc": {"version": 1}}
+        )
+
+    async def rebuild_partner_stats(self, partner_id):
+        """Recompute the partner's counters from source, retrying if a write races the rebuild."""
+        for _ in range(REBUILD_ATTEMPTS):
+            current = await mongodb.db.partner_stats.find_one({"partner_id": partner_id}, {"_id": 0, "version": 1})
+            stats = await self._count_partner_stats(partner_id)
+            if current is None:
+                try:
+                    await mongodb.db.partner_stats.insert_one({**stats, "version": 0})
+                    return stats
+                except DuplicateKeyError:
+                    continue
+            # version None also matches documents written before versioning
+            result = await mongodb.db.partner_stats.update_one(
+                {"partner_id": partner_id, "version": current.get("version")},
+                {"$set": {**stats, "version": (current.get("version") or 0) + 1}}
+            )
+            if result.matched_count:
+                return stats
+        logging.warning(f"Partner stats for {partner_id} kept changing during rebuild; left for the next run")
+        return stats
+
+    async def _count_partner_stats(self, partner_id):
+        now = datetime.now(timezone.utc)
+        hour_start = now.replace(minute=0, second=0, microsecond=0)
+        month = now.year * 12 + now.month - 1 - (REVENUE_MONTHS - 1)
+        revenue_since = datetime(month // 12, month % 12 + 1, 1, tzinfo=timezone.utc)
+
+        listing_ids = await mongodb.db.listings.distinct("id", {"partner_id": partner_id})
+        active_listings = await mongodb.db.listings.count_documents({"partner_id": partner_id, "status": "active"})
+        total_bookings = await mongodb.db.bookings.count_documents({"listing_id": {"$in": listing_ids}})
+
+        revenue = await mongodb.db.bookings.aggregate([
+            {"$match": {
+                "listing_id": {"$in": listing_ids},
+                "booking_status": {"$in": list(REVENUE_STATUSES)},
+                "booked_at": {"$gte": revenue_since}
+            }},
+            {"$group": {
+                "_id": {"$dateToString": {"format": "%Y-%m", "date": "$booked_at"}},
+                "total": {"$sum": "$total_inr"}
+            }}
+        ]).to_list(None)
+
+        sessions = await mongodb.db.sessions.aggregate([
+            {"$match": {
+                "listing_id": {"$in": listing_ids},
+                "status": "scheduled",
+                "start_at": {"$gte": hour_start}
+            }},
+            {"$group": {
+                "_id": {"$dateToString": {"format": "%Y%m%d%H", "date": "$start_at"}},
+                "count": {"$sum": 1}
+            }}
+        ]).to_list(None)
+
+        stats = {
+            "partner_id": partner_id,
+            "total_bookings": total_bookings,
+            "active_listings": active_listings,
+            "revenue_by_month": {row["_id"]: row["total"] for row in revenue},
+            "sessions_by_hour": {row["_id"]: row["count"] for row in sessions},
+            "reconciled_at": now
+        }
+        return stats
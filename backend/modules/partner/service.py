@@ -1,3 +1,20 @@
+import time
+
+from fastapi.responses import StreamingResponse
+
+from backend.core.dataloader import clear_loader
+from backend.core.idempotency import idempotency_store, request_fingerprint
+from backend.modules.auth.utility import principal_cache
+from backend.modules.listing.cache import schedule_cache
+from backend.modules.partner.repository import PartnerRepository
+from backend.modules.sessions.repository import SessionRepository
+from backend.modules.sessions.utility import session_id_for
+from backend.modules.partner.utility import (
+    TRANSACTION_EXPORT_FIELDS, BOOKING_EXPORT_FIELDS,
+    encode_transaction_cursor, decode_transaction_cursor, csv_line, ndjson_line
+)
+
+
 @api_router.post("/partners")
 async def create_partner(data: PartnerCreate, current_user: Dict = Depends(get_current_user)):
     # Allow partner_owner or admin to create partner profiles
@@ -91,6 +108,8 @@ async def create_partner(data: PartnerCreate, current_user: Dict = Depends(get_c
             {"id": current_user["id"]},
             {"$set": {"role": "partner_owner"}}
         )
+        clear_loader("users.id", current_user["id"])
+        principal_cache.invalidate(current_user["id"])
         # Issue new token with updated role
         new_token = create_token(current_user["id"], "partner_owner")
     else:
@@ -383,53 +402,11 @@ async def get_partner_stats(current_user: Dict = Depends(get_current_user)):
     if not partner:
         raise HTTPException(status_code=404, detail="Partner not found")
     
-    partner_id = partner["id"]
-    
-    # Get partner's listings first (limit to reasonable number)
-    listings = await db.listings.find({"partner_id": partner_id}, {"id": 1}).to_list(500)
-    listing_ids = [l["id"] for l in listings]
-    
-    # Get stats
-    total_bookings = await db.bookings.count_documents({"listing_id": {"$in": listing_ids}})
-    
-    # Revenue this month
-    start_of_month = datetime.now(timezone.utc).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-    revenue_pipeline = [
-        {
-            "$match": {
-                "listing_id": {"$in": listing_ids},
-                "booking_status": {"$in": ["confirmed", "attended"]},
-                "booked_at": {"$gte": start_of_month}
-            }
-        },
-        {
-            "$group": {
-                "_id": None,
-                "total": {"$sum": "$total_inr"}
-            }
-        }
-    ]
-    revenue_result = await db.bookings.aggregate(revenue_pipeline).to_list(1)
-    revenue_this_month = revenue_result[0]["total"] if revenue_result else 0.0
-    
-    # Active listings
-    active_listings = await db.listings.count_documents({
-        "partner_id": partner_id,
-        "status": "active"
-    })
-    
-    # Upcoming sessions
-    upcoming_sessions = await db.sessions.count_documents({
-        "listing_id": {"$in": listing_ids},
-        "start_at": {"$gte": datetime.now(timezone.utc)},
-        "status": "scheduled"
-    })
+    # Counters are maintained incrementally; see PartnerRepository.get_partner_stats
+    stats = await PartnerRepository().get_partner_stats(partner["id"])
     
     return {
-        "total_bookings": total_bookings,
-        "revenue_this_month": revenue_this_month,
-        "active_listings": active_listings,
-        "upcoming_sessions": upcoming_sessions,
+        **stats,
         "pending_approvals": 0
     }
 
@@ -538,91 +515,99 @@ async def get_partner_bookings_advanced(
     if session_id:
         query["session_id"] = session_id
     
-    # Date range filter on session start_at
+    # Text search in child name
+    if q:
+        query["child_profile_name"] = {"$regex": q, "$options": "i"}
+    
+    # Date range filter on the session start copied onto each booking, applied before paging
     if from_date or to_date:
         date_query = {}
         if from_date:
             date_query["$gte"] = datetime.fromisoformat(from_date.replace('Z', '+00:00'))
         if to_date:
             date_query["$lte"] = datetime.fromisoformat(to_date.replace('Z', '+00:00'))
-        # We'll filter by session date after fetching
+        query["session_start_at"] = date_query
     
-    # Text search in child name
-    if q:
-        query["child_profile_name"] = {"$regex": q, "$options": "i"}
+    # Page and total from the same filtered stream; sessions are joined for the page only
+    skip = (page - 1) * limit
+    pipeline = [
+        {"$match": query},
+        {"$sort": {"booked_at": -1}},
+        {"$facet": {
+            "bookings": [
+                {"$skip": skip},
+                {"$limit": limit},
+                {"$lookup": {
+                    "from": "sessions",
+                    "localField": "session_id",
+                    "foreignField": "id",
+                    "as": "session"
+                }},
+                # Bookings whose session was deleted are still listed
+                {"$unwind": {"path": "$session", "preserveNullAndEmptyArrays": True}},
+                {"$project": {
+                    "_id": 0,
+                    "id": 1, "booked_at": 1, "booking_status": 1, "user_id": 1,
+                    "child_profile_name": 1, "child_profile_age": 1,
+                    "listing_id": 1, "session_id": 1, "session_start_at": 1,
+                    "payment_method": 1, "total_inr": 1, "credits_used": 1,
+                    "attendance": 1, "attendance_notes": 1,
+                    "session.start_at": 1, "session.seats_total": 1
+                }}
+            ],
+            "total": [{"$count": "count"}]
+        }}
+    ]
     
-    # Get total count
-    total = await db.bookings.count_documents(query)
+    result = await db.bookings.aggregate(pipeline).to_list(1)
+    bookings = result[0]["bookings"] if result else []
+    total = result[0]["total"][0]["count"] if result and result[0]["total"] else 0
     
-    # Get bookings with pagination
-    skip = (page - 1) * limit
-    bookings = await db.bookings.find(
-        query,
-        {"_id": 0}
-    ).sort("booked_at", -1).skip(skip).limit(limit).to_list(limit)
+    # Customers for the whole page in one query
+    user_ids = list({booking["user_id"] for booking in bookings})
+    users = await db.users.find(
+        {"id": {"$in": user_ids}},
+        {"_id": 0, "id": 1, "name": 1, "email": 1, "phone": 1}
+    ).to_list(None)
+    user_map = {user["id"]: user for user in users}
     
-    # Enrich with listing and session data
     items = []
     for booking in bookings:
-        # Get session
-        session = await db.sessions.find_one(
-            {"id": booking["session_id"]},
-            {"_id": 0, "start_at": 1, "seats_total": 1}
-        )
-        
-        # Apply date filter if needed
-        if session and (from_date or to_date):
-            session_start = session["start_at"]
-            if session_start.tzinfo is None:
-                session_start = session_start.replace(tzinfo=timezone.utc)
-            
-            if from_date:
-                from_dt = datetime.fromisoformat(from_date.replace('Z', '+00:00'))
-                if session_start < from_dt:
-                    continue
-            if to_date:
-                to_dt = datetime.fromisoformat(to_date.replace('Z', '+00:00'))
-                if session_start > to_dt:
-                    continue
+        session = booking.get("session") or {}
+        start_at = session.get("start_at") or booking.get("session_start_at")
+        user = user_map.get(booking["user_id"])
         
-        if session:
-            # Get user info
-            user = await db.users.find_one(
-                {"id": booking["user_id"]},
-                {"_id": 0, "name": 1, "email": 1, "phone": 1}
-            )
-            
-            item = {
-                "booking_id": booking["id"],
-                "created_at": booking["booked_at"].isoformat() if booking["booked_at"] else None,
-                "status": booking["booking_status"],
-                "child": {
-                    "name": booking["child_profile_name"],
-                    "age_band": f"{booking['child_profile_age']}-{booking['child_profile_age']+1}"
-                },
-                "listing": {
-                    "id": booking["listing_id"],
-                    "title": listing_map.get(booking["listing_id"], "Unknown")
-                },
-                "session": {
-                    "id": booking["session_id"],
-                    "start_at": session["start_at"].isoformat() if session["start_at"] else None,
-                    "seats_total": session.get("seats_total", 0)
-                },
-                "payment": {
-                    "method": booking["payment_method"],
-                    "total_inr": booking["total_inr"],
-                    "credits_used": booking["credits_used"]
-                },
-                "attendance": booking.get("attendance"),
-                "notes": booking.get("attendance_notes", ""),
-                "customer": {
-                    "name": user.get("name", "Unknown") if user else "Unknown",
-                    "email": user.get("email", "") if user else "",
-                    "phone": user.get("phone", "") if user else ""
-                }
+        item = {
+            "booking_id": booking["id"],
+            "created_at": booking["booked_at"].isoformat() if booking["booked_at"] else None,
+            "status": booking["booking_status"],
+            "child": {
+                "name": booking["child_profile_name"],
+                "age_band": f"{booking['child_profile_age']}-{booking['child_profile_age']+1}"
+            },
+            "listing": {
+                "id": booking["listing_id"],
+                "title": listing_map.get(booking["listing_id"], "Unknown")
+            },
+            "session": {
+                "id": booking["session_id"],
+                "start_at": start_at.isoformat() if start_at else None,
+                "seats_total": session.get("seats_total", 0)
+            },
+            "payment": {
+                "method": booking["payment_method"],
+                "total_inr": booking["total_inr"],
+                "credits_used": booking["credits_used"]
+            },
+            "attendance": booking.get("attendance"),
+            "notes": booking.get("attendance_notes", ""),
+            "customer": {
+                "name": user.get("name", "Unknown") if user else "Unknown",
+                "email": user.get("email", "") if user else "",
+                "phone": user.get("phone", "") if user else ""
             }
-            items.append(item)
+        }
+        items.append(item)
     
     return {
         "items": items,
@@ -630,6 +615,58 @@ async def get_partner_bookings_advanced(
         "total": total
     }
 
+@api_router.get("/partner/bookings/export")
+async def export_partner_bookings(
+    from_date: Optional[str] = None,
+    to_date: Optional[str] = None,
+    status: Optional[str] = None,
+    listing_id: Optional[str] = None,
+    format: str = "csv",  # "csv" or "ndjson"
+    current_user: Dict = Depends(get_current_user)
+):
+    """Stream the partner's bookings as CSV or NDJSON; dates filter on session start"""
+    if format not in ("csv", "ndjson"):
+        raise HTTPException(status_code=400, detail="format must be csv or ndjson")
+    partner, listing_map = await _partner_for_finance(current_user)
+    
+    query = {"listing_id": {"$in": list(listing_map)}}
+    if status:
+        query["booking_status"] = status
+    if listing_id:
+        query["listing_id"] = listing_id
+    date_filter = _date_filter(from_date, to_date)
+    if date_filter:
+        query["session_start_at"] = date_filter
+    
+    async def rows():
+        if format == "csv":
+            yield csv_line(dict(zip(BOOKING_EXPORT_FIELDS, BOOKING_EXPORT_FIELDS)), BOOKING_EXPORT_FIELDS)
+        cursor = db.bookings.find(query, {"_id": 0}).sort("booked_at", -1).batch_size(1000)
+        async for booking in cursor:
+            row = {
+                "id": booking["id"],
+                "booked_at": booking.get("booked_at"),
+                "status": booking.get("booking_status"),
+                "listing_id": booking["listing_id"],
+                "listing_title": listing_map.get(booking["listing_id"], "Unknown"),
+                "session_id": booking.get("session_id"),
+                "session_start_at": booking.get("session_start_at"),
+                "session_end_at": booking.get("session_end_at"),
+                "child_name": booking.get("child_profile_name"),
+                "child_age": booking.get("child_profile_age"),
+                "payment_method": booking.get("payment_method"),
+                "total_inr": booking.get("total_inr"),
+                "credits_used": booking.get("credits_used"),
+                "attendance": booking.get("attendance")
+            }
+            yield csv_line(row, BOOKING_EXPORT_FIELDS) if format == "csv" else ndjson_line(row)
+    
+    return StreamingResponse(
+        rows(),
+        media_type="text/csv" if format == "csv" else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="bookings.{format}"'}
+    )
+
 @api_router.put("/partner/bookings/{booking_id}/attendance")
 async def mark_attendance(
     booking_id: str,
@@ -685,6 +722,8 @@ async def mark_attendance(
         }
     )
     
+    await PartnerRepository().record_booking_status(partner["id"], booking, new_status)
+    
     # Create audit log
     audit_entry = {
         "id": str(uuid.uuid4()),
@@ -719,6 +758,16 @@ async def partner_cancel_booking(
     current_user: Dict = Depends(get_current_user)
 ):
     """Partner cancels a booking - issues full refund + goodwill credit"""
+    return await idempotency_store.run(
+        idempotency_key,
+        current_user["id"],
+        "partner.bookings.cancel",
+        lambda: _partner_cancel_booking(booking_id, request, current_user),
+        fingerprint=request_fingerprint(booking_id, request.model_dump_json())
+    )
+
+
+async def _partner_cancel_booking(booking_id: str, request: PartnerCancelBookingRequest, current_user: Dict):
     if current_user["role"] not in ["partner_owner", "partner_staff"]:
         raise HTTPException(status_code=403, detail="Not a partner")
     
@@ -767,7 +816,7 @@ async def partner_cancel_booking(
     refund_credits = booking["credits_used"]
     
     # Release seat
-    await db.sessions.update_one({"id": booking["session_id"]}, {"$inc": {"seats_booked": -1}})
+    await SessionRepository().update_remove_session(booking["session_id"])
     
     # Refund credits + goodwill
     total_credits_refund = refund_credits + goodwill_credits
@@ -811,6 +860,7 @@ async def partner_cancel_booking(
             }
         }
     )
+    await PartnerRepository().record_booking_status(partner["id"], booking, "canceled")
     
     # Create audit log
     audit_entry = {
@@ -856,22 +906,11 @@ class PayoutRequest(BaseModel):
     bank_account_id: Optional[str] = None
     notes: Optional[str] = None
 
-@api_router.get("/partner/financials/summary")
-async def get_partner_financials_summary(current_user: Dict = Depends(get_current_user)):
-    """Get partner's financial summary - earnings, pending payouts, available balance"""
-    if current_user["role"] not in ["partner_owner", "partner_staff"]:
-        raise HTTPException(status_code=403, detail="Not a partner")
+async def _financial_summary(partner: Dict):
+    """Totals come from $group aggregations; no booking or payout documents are loaded."""
+    totals = await PartnerRepository().get_financial_totals(partner["id"])
     
-    # Get partner
-    partner = await db.partners.find_one({"owner_user_id": current_user["id"]}, {"_id": 0})
-    if not partner:
-        raise HTTPException(status_code=404, detail="Partner profile not found")
-    
-    # Get partner's listings
-    listings = await db.listings.find({"partner_id": partner["id"]}, {"_id": 0, "id": 1}).to_list(500)
-    listing_ids = [l["id"] for l in listings]
-    
-    if not listing_ids:
+    if not totals["has_listings"]:
         return {
             "total_earnings_inr": 0,
             "available_balance_inr": 0,
@@ -882,40 +921,14 @@ async def get_partner_financials_summary(current_user: Dict = Depends(get_curren
             "currency": "INR"
         }
     
-    # Get all payout-eligible bookings (attended status with payout_eligible=True)
-    eligible_bookings = await db.bookings.find({
-        "listing_id": {"$in": listing_ids},
-        "booking_status": "attended",
-        "payout_eligible": True
-    }, {"_id": 0}).to_list(None)
-    
-    # Get all bookings for total count
-    total_bookings = await db.bookings.count_documents({
-        "listing_id": {"$in": listing_ids},
-        "booking_status": {"$in": ["confirmed", "attended"]}
-    })
-    
-    # Calculate gross earnings from eligible bookings
-    gross_earnings = sum(b.get("total_inr", 0) for b in eligible_bookings)
-    
     # Calculate commission
+    gross_earnings = totals["gross_earnings"]
     commission_rate = partner.get("commission_percent", 15.0) / 100
     commission_amount = gross_earnings * commission_rate
     net_earnings = gross_earnings - commission_amount
     
-    # Get pending payout requests
-    pending_payouts = await db.payout_requests.find({
-        "partner_id": partner["id"],
-        "status": "pending"
-    }, {"_id": 0}).to_list(None)
-    pending_payout_amount = sum(p.get("amount_inr", 0) for p in pending_payouts)
-    
-    # Get completed payouts for lifetime earnings
-    completed_payouts = await db.payout_requests.find({
-        "partner_id": partner["id"],
-        "status": "completed"
-    }, {"_id": 0}).to_list(None)
-    completed_payout_amount = sum(p.get("amount_inr", 0) for p in completed_payouts)
+    pending_payout_amount = totals["pending_payouts"]
+    completed_payout_amount = totals["completed_payouts"]
     
     # Available balance = net earnings - pending payouts - completed payouts
     available_balance = net_earnings - pending_payout_amount - completed_payout_amount
@@ -925,24 +938,16 @@ async def get_partner_financials_summary(current_user: Dict = Depends(get_curren
         "available_balance_inr": round(available_balance, 2),
         "pending_payout_inr": round(pending_payout_amount, 2),
         "lifetime_earnings_inr": round(completed_payout_amount, 2),
-        "total_bookings": total_bookings,
+        "total_bookings": totals["total_bookings"],
         "commission_rate": partner.get("commission_percent", 15.0),
         "currency": "INR",
         "gross_revenue_inr": round(gross_earnings, 2),
         "commission_paid_inr": round(commission_amount, 2)
     }
 
-
-@api_router.get("/partner/financials/transactions")
-async def get_partner_transactions(
-    from_date: Optional[str] = None,
-    to_date: Optional[str] = None,
-    transaction_type: Optional[str] = None,  # "booking" or "payout"
-    page: int = 1,
-    limit: int = 50,
-    current_user: Dict = Depends(get_current_user)
-):
-    """Get partner's transaction history"""
+@api_router.get("/partner/financials/summary")
+async def get_partner_financials_summary(current_user: Dict = Depends(get_current_user)):
+    """Get partner's financial summary - earnings, pending payouts, available balance"""
     if current_user["role"] not in ["partner_owner", "partner_staff"]:
         raise HTTPException(status_code=403, detail="Not a partner")
     
@@ -951,91 +956,220 @@ async def get_partner_transactions(
     if not partner:
         raise HTTPException(status_code=404, detail="Partner profile not found")
     
-    # Get partner's listings
-    listings = await db.listings.find({"partner_id": partner["id"]}, {"_id": 0, "id": 1, "title": 1}).to_list(500)
-    listing_ids = [l["id"] for l in listings]
-    listing_map = {l["id"]: l["title"] for l in listings}
-    
-    transactions = []
-    
-    # Build date filter
+    return await _financial_summary(partner)
+
+
+def _date_filter(from_date: Optional[str], to_date: Optional[str]) -> dict:
     date_filter = {}
     if from_date:
         date_filter["$gte"] = datetime.fromisoformat(from_date.replace('Z', '+00:00'))
     if to_date:
         date_filter["$lte"] = datetime.fromisoformat(to_date.replace('Z', '+00:00'))
-    
-    # Get bookings as transactions
+    return date_filter
+
+
+def _transaction_queries(partner, listing_ids, date_filter, transaction_type):
+    """(collection, date field, query) for each transaction source that is requested"""
+    queries = []
     if not transaction_type or transaction_type == "booking":
         booking_query = {
             "listing_id": {"$in": listing_ids},
             "booking_status": {"$in": ["confirmed", "attended", "refunded"]}
         }
         if date_filter:
-            booking_query["booked_at"] = date_filter
-        
-        bookings = await db.bookings.find(booking_query, {"_id": 0}).sort("booked_at", -1).to_list(1000)
-        
-        commission_rate = partner.get("commission_percent", 15.0) / 100
-        
-        for booking in bookings:
-            gross_amount = booking.get("total_inr", 0)
+            booking_query["booked_at"] = dict(date_filter)
+        queries.append(("bookings", "booked_at", booking_query))
+    if not transaction_type or transaction_type == "payout":
+        payout_query = {"partner_id": partner["id"]}
+        if date_filter:
+            payout_query["requested_at"] = dict(date_filter)
+        queries.append(("payout_requests", "requested_at", payout_query))
+    return queries
+
+
+async def _transaction_stream(collection, field, query, partner, listing_map, after=None, limit=0):
+    """One source as transactions, newest first by (date, id), resuming after the ``after`` key"""
+    if after:
+        date, last_id = after
+        query = {**query, "$or": [{field: {"$lt": date}}, {field: date, "id": {"$lt": last_id}}]}
+    cursor = db[collection].find(query, {"_id": 0}).sort([(field, -1), ("id", -1)]).batch_size(1000)
+    if limit:
+        cursor = cursor.limit(limit)
+    
+    commission_rate = partner.get("commission_percent", 15.0) / 100
+    async for doc in cursor:
+        if collection == "bookings":
+            gross_amount = doc.get("total_inr", 0)
             commission = gross_amount * commission_rate
-            net_amount = gross_amount - commission
-            
-            transactions.append({
-                "id": booking["id"],
+            yield {
+                "id": doc["id"],
                 "type": "booking",
-                "date": booking["booked_at"],
-                "listing_title": listing_map.get(booking["listing_id"], "Unknown"),
-                "child_name": booking.get("child_profile_name", "Unknown"),
+                "date": doc["booked_at"],
+                "listing_title": listing_map.get(doc["listing_id"], "Unknown"),
+                "child_name": doc.get("child_profile_name", "Unknown"),
                 "gross_amount_inr": round(gross_amount, 2),
                 "commission_inr": round(commission, 2),
-                "net_amount_inr": round(net_amount, 2),
-                "status": booking["booking_status"],
-                "payout_eligible": booking.get("payout_eligible", False)
-            })
-    
-    # Get payout requests as transactions
-    if not transaction_type or transaction_type == "payout":
-        payout_query = {"partner_id": partner["id"]}
-        if date_filter:
-            payout_query["requested_at"] = date_filter
-        
-        payouts = await db.payout_requests.find(payout_query, {"_id": 0}).sort("requested_at", -1).to_list(200)
-        
-        for payout in payouts:
-            transactions.append({
-                "id": payout["id"],
+                "net_amount_inr": round(gross_amount - commission, 2),
+                "status": doc["booking_status"],
+                "payout_eligible": doc.get("payout_eligible", False)
+            }
+        else:
+            yield {
+                "id": doc["id"],
                 "type": "payout",
-                "date": payout["requested_at"],
-                "amount_inr": payout["amount_inr"],
-                "status": payout["status"],
-                "notes": payout.get("notes", ""),
-                "processed_at": payout.get("processed_at"),
-                "reference_number": payout.get("reference_number", "")
-            })
-    
-    # Sort by date
-    transactions.sort(key=lambda x: x["date"], reverse=True)
-    
-    # Paginate
-    total = len(transactions)
-    start = (page - 1) * limit
-    end = start + limit
-    paginated = transactions[start:end]
+                "date": doc["requested_at"],
+                "amount_inr": doc["amount_inr"],
+                "status": doc["status"],
+                "notes": doc.get("notes", ""),
+                "processed_at": doc.get("processed_at"),
+                "reference_number": doc.get("reference_number", "")
+            }
+
+
+async def _merge_transactions(streams):
+    """Merge streams that are each newest first into one newest-first stream, holding one item per stream"""
+    async def _next(stream):
+        try:
+            return await stream.__anext__()
+        except StopAsyncIteration:
+            return None
+    
+    heads = {}
+    for index, stream in enumerate(streams):
+        item = await _next(stream)
+        if item is not None:
+            heads[index] = item
+    while heads:
+        index = max(heads, key=lambda i: (heads[i]["date"], heads[i]["id"]))
+        yield heads[index]
+        item = await _next(streams[index])
+        if item is None:
+            del heads[index]
+        else:
+            heads[index] = item
+
+
+async def _partner_for_finance(current_user):
+    if current_user["role"] not in ["partner_owner", "partner_staff"]:
+        raise HTTPException(status_code=403, detail="Not a partner")
     
-    return {
-        "transactions": paginated,
-        "page": page,
-        "total": total,
-        "pages": (total + limit - 1) // limit if limit > 0 else 0
+    partner = await db.partners.find_one({"owner_user_id": current_user["id"]}, {"_id": 0})
+    if not partner:
+        raise HTTPException(status_code=404, detail="Partner profile not found")
+    
+    listings = await db.listings.find({"partner_id": partner["id"]}, {"_id": 0, "id": 1, "title": 1}).to_list(None)
+    return partner, {l["id"]: l["title"] for l in listings}
+
+
+@api_router.get("/partner/financials/transactions")
+async def get_partner_transactions(
+    from_date: Optional[str] = None,
+    to_date: Optional[str] = None,
+    transaction_type: Optional[str] = None,  # "booking" or "payout"
+    cursor: Optional[str] = None,
+    page: Optional[int] = None,  # Deprecated: offset paging, use cursor instead
+    limit: int = 50,
+    current_user: Dict = Depends(get_current_user)
+):
+    """Get partner's transaction history, newest first; pass ``next_cursor`` back for the next page.
+
+    Without a cursor the response also carries ``total``, ``page`` and
+    ``pages`` as before; ``page`` (deprecated) selects an offset page. Cursor
+    pages skip the count and return ``total`` as None.
+    """
+    partner, listing_map = await _partner_for_finance(current_user)
+    
+    try:
+        after = decode_transaction_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if page is not None and (cursor or page < 1):
+        raise HTTPException(status_code=400, detail="page must be >= 1 and cannot be combined with cursor")
+    
+    queries = _transaction_queries(partner, list(listing_map), _date_filter(from_date, to_date), transaction_type)
+    
+    # Each source needs at most offset + limit + 1 rows to fill the page and detect more
+    skip = (page - 1) * limit if page else 0
+    streams = [
+        _transaction_stream(collection, field, query, partner, listing_map, after=after, limit=skip + limit + 1)
+        for collection, field, query in queries
+    ]
+    transactions = []
+    async for transaction in _merge_transactions(streams):
+        transactions.append(transaction)
+        if len(transactions) > skip + limit:
+            break
+    
+    transactions = transactions[skip:]
+    has_more = len(transactions) > limit
+    transactions = transactions[:limit]
+    
+    response = {
+        "transactions": transactions,
+        "next_cursor": encode_transaction_cursor(transactions[-1]) if has_more else None,
+        "has_more": has_more,
+        "total": None
     }
+    if cursor:
+        return response
+    
+    total = 0
+    for collection, _, query in queries:
+        total += await db[collection].count_documents(query)
+    response["total"] = total
+    response["page"] = page or 1
+    response["pages"] = (total + limit - 1) // limit
+    return response
+
+
+@api_router.get("/partner/financials/transactions/export")
+async def export_partner_transactions(
+    from_date: Optional[str] = None,
+    to_date: Optional[str] = None,
+    transaction_type: Optional[str] = None,  # "booking" or "payout"
+    format: str = "csv",  # "csv" or "ndjson"
+    current_user: Dict = Depends(get_current_user)
+):
+    """Stream the full transaction history as CSV or NDJSON"""
+    if format not in ("csv", "ndjson"):
+        raise HTTPException(status_code=400, detail="format must be csv or ndjson")
+    partner, listing_map = await _partner_for_finance(current_user)
+    queries = _transaction_queries(partner, list(listing_map), _date_filter(from_date, to_date), transaction_type)
+    
+    async def rows():
+        if format == "csv":
+            yield csv_line(dict(zip(TRANSACTION_EXPORT_FIELDS, TRANSACTION_EXPORT_FIELDS)), TRANSACTION_EXPORT_FIELDS)
+        streams = [
+            _transaction_stream(collection, field, query, partner, listing_map)
+            for collection, field, query in queries
+        ]
+        async for transaction in _merge_transactions(streams):
+            yield csv_line(transaction, TRANSACTION_EXPORT_FIELDS) if format == "csv" else ndjson_line(transaction)
+    
+    return StreamingResponse(
+        rows(),
+        media_type="text/csv" if format == "csv" else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="transactions.{format}"'}
+    )
 
 
 @api_router.post("/partner/financials/payout-request")
-async def request_payout(request: PayoutRequest, current_user: Dict = Depends(get_current_user)):
+async def request_payout(
+    request: PayoutRequest,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    current_user: Dict = Depends(get_current_user)
+):
     """Request a payout"""
+    return await idempotency_store.run(
+        idempotency_key,
+        current_user["id"],
+        "partner.financials.payout_request",
+        lambda: _request_payout(request, current_user),
+        fingerprint=request_fingerprint(request.model_dump_json())
+    )
+
+
+async def _request_payout(request: PayoutRequest, current_user: Dict):
     if current_user["role"] not in ["partner_owner"]:
         raise HTTPException(status_code=403, detail="Only partner owners can request payouts")
     
@@ -1049,7 +1183,7 @@ async def request_payout(request: PayoutRequest, current_user: Dict = Depends(ge
         raise HTTPException(status_code=400, detail="Please add bank details before requesting payout")
     
     # Get financial summary to check available balance
-    summary_response = await get_partner_financials_summary(current_user)
+    summary_response = await _financial_summary(partner)
     available_balance = summary_response["available_balance_inr"]
     
     # Validate amount
@@ -1284,7 +1418,8 @@ async def bulk_create_sessions(
     
     selected_weekdays = [day_map[day.lower()] for day in days if day.lower() in day_map]
     
-    sessions_created = []
+    started = time.perf_counter()
+    session_docs = []
     current_date = start
     
     while current_date <= end:
@@ -1306,7 +1441,7 @@ async def bulk_create_sessions(
                 session_end = session_start + timedelta(minutes=duration_minutes)
                 
                 session = Session(
-                    id=str(uuid.uuid4()),
+                    id=session_id_for(listing_id, None, session_start),
                     listing_id=listing_id,
                     start_at=session_start,
                     end_at=session_end,
@@ -1316,14 +1451,25 @@ async def bulk_create_sessions(
                     status="scheduled"
                 )
                 
-                await db.sessions.insert_one(session.model_dump())
-                sessions_created.append(session.id)
+                session_docs.append(session.model_dump())
         
         current_date += timedelta(days=1)
     
+    # One unordered insert_many per chunk; ids are deterministic so retries skip existing sessions
+    computed = time.perf_counter()
+    created, skipped = await SessionRepository().add_sessions(session_docs)
+    written = time.perf_counter()
+    
+    await PartnerRepository().record_sessions(partner["id"], [s["start_at"] for s in created])
+    
     return {
-        "message": f"Created {len(sessions_created)} sessions",
-        "sessions_created": len(sessions_created)
+        "message": f"Created {len(created)} sessions",
+        "sessions_created": len(created),
+        "sessions_skipped": skipped,
+        "timings_ms": {
+            "compute": round((computed - started) * 1000, 1),
+            "write": round((written - computed) * 1000, 1)
+        }
     }
 
 @api_router.delete("/sessions/{session_id}")
@@ -1340,8 +1486,14 @@ async def delete_session(
     if bookings_count > 0:
         raise HTTPException(status_code=400, detail="Cannot delete session with existing bookings")
     
-    result = await db.sessions.delete_one({"id": session_id})
-    if result.deleted_count == 0:
+    session = await db.sessions.find_one_and_delete({"id": session_id}, {"_id": 0})
+    if not session:
         raise HTTPException(status_code=404, detail="Session not found")
+    schedule_cache.invalidate_tag(session["listing_id"])
+    
+    if session.get("status") == "scheduled" and session.get("start_at"):
+        listing = await db.listings.find_one({"id": session["listing_id"]}, {"_id": 0, "partner_id": 1})
+        if listing:
+            await PartnerRepository().record_sessions(listing["partner_id"], [session["start_at"]], delta=-1)
     
     return {"message": "Session deleted successfully"}
@@ -0,0 +1,47 @@
+import base64
+import csv
+import io
+import json
+from datetime import datetime
+
+# Column order for CSV transaction exports; bookings and payouts leave the other kind's columns empty
+TRANSACTION_EXPORT_FIELDS = [
+    "id", "type", "date", "listing_title", "child_name",
+    "gross_amount_inr", "commission_inr", "net_amount_inr", "amount_inr",
+    "status", "payout_eligible", "notes", "processed_at", "reference_number"
+]
+
+BOOKING_EXPORT_FIELDS = [
+    "id", "booked_at", "status", "listing_id", "listing_title", "session_id",
+    "session_start_at", "session_end_at", "child_name", "child_age",
+    "payment_method", "total_inr", "credits_used", "attendance"
+]
+
+
+def encode_transaction_cursor(transaction: dict) -> str:
+    """Opaque cursor holding the (date, id) sort key of the last transaction on a page"""
+    key = [transaction["date"].isoformat(), transaction["id"]]
+    return base64.urlsafe_b64encode(json.dumps(key).encode("utf-8")).decode("ascii")
+
+
+def decode_transaction_cursor(cursor: str) -> tuple:
+    """Inverse of encode_transaction_cursor; raises ValueError on a malformed cursor"""
+    try:
+        date, transaction_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return datetime.fromisoformat(date), str(transaction_id)
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def _export_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def csv_line(row: dict, fields: list) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(["" if row.get(f) is None else _export_value(row.get(f)) for f in fields])
+    return buffer.getvalue()
+
+
+def ndjson_line(row: dict) -> str:
+    return json.dumps({k: _export_value(v) for k, v in row.items()}) + "\n"
@@ -0,0 +1,128 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from backend.core.config import SESSION_ADMISSION_REFRESH_SECONDS, SESSION_ADMISSION_MAX_SESSIONS
+from backend.core.database import mongodb
+from backend.core.metrics import register_metrics
+
+
+class _SeatGate:
+    __slots__ = ("available", "holders", "loaded_at", "lock")
+
+    def __init__(self):
+        self.available: Optional[int] = None  # seats left per the last Mongo read, minus local wins
+        self.holders = 0                      # admitted requests that have not settled yet
+        self.loaded_at = 0.0
+        self.lock = asyncio.Lock()
+
+
+class SeatTicket:
+    """Admission for one booking attempt; settle with the DB outcome, then release."""
+
+    def __init__(self, gate: _SeatGate, counted: bool = True):
+        self._gate = gate
+        self._counted = counted
+        self._released = False
+
+    def settle(self, reserved: bool):
+        gate = self._gate
+        if gate.available is None:
+            return
+        if reserved:
+            gate.available = max(0, gate.available - 1)
+        else:
+            # Mongo says the session is full (another worker won); stop admitting until refresh
+            gate.available = 0
+
+    def release(self):
+        if self._counted and not self._released:
+            self._released = True
+            self._gate.holders -= 1
+
+
+class SessionAdmission:
+    """In-process admission control in front of the conditional seat ``$inc``.
+
+    Each session gets a gate holding the seats left (refreshed from Mongo at
+    most every ``refresh_seconds``; concurrent refreshes queue on one read).
+    At most ``available`` requests are admitted at once; the rest are
+    rejected before any listing, wallet or trial lookups. Mongo remains the
+    source of truth: a lost ``$inc`` closes the gate until the next refresh.
+    """
+
+    def __init__(self, refresh_seconds: float, max_sessions: int):
+        self.refresh_seconds = refresh_seconds
+        self.max_sessions = max_sessions
+        self._gates: "OrderedDict[str, _SeatGate]" = OrderedDict()
+        self.admitted = 0
+        self.rejected = 0
+        self.refreshes = 0
+
+    def _gate(self, session_id: str) -> _SeatGate:
+        gate = self._gates.get(session_id)
+        if gate is None:
+            gate = self._gates[session_id] = _SeatGate()
+            while len(self._gates) > self.max_sessions:
+                oldest_id, oldest = next(iter(self._gates.items()))
+                if oldest.holders:
+                    break
+                del self._gates[oldest_id]
+        else:
+            self._gates.move_to_end(session_id)
+        return gate
+
+    async def _refresh(self, session_id: str, gate: _SeatGate):
+        session = await mongodb.db.sessions.find_one(
+            {"id": session_id},
+            {"_id": 0, "status": 1, "seats_total": 1, "seats_booked": 1}
+        )
+        self.refreshes += 1
+        gate.loaded_at = time.monotonic()
+        if session is None:
+            gate.available = None
+        elif session.get("status") != "scheduled":
+            gate.available = 0
+        else:
+            gate.available = max(0, session.get("seats_total", 0) - session.get("seats_booked", 0))
+
+    async def acquire(self, session_id: str) -> Optional[SeatTicket]:
+        """Return a ticket, or None when the session has no seat left for this request."""
+        gate = self._gate(session_id)
+        if time.monotonic() - gate.loaded_at >= self.refresh_seconds:
+            async with gate.lock:
+                if time.monotonic() - gate.loaded_at >= self.refresh_seconds:
+                    await self._refresh(session_id, gate)
+
+        if gate.available is None:
+            # Unknown session: let the normal lookup produce the 404
+            return SeatTicket(gate, counted=False)
+        if gate.holders >= gate.available:
+            self.rejected += 1
+            return None
+
+        gate.holders += 1
+        self.admitted += 1
+        return SeatTicket(gate)
+
+    def invalidate(self, session_id: str):
+        """Force a reload after seats are released or changed outside the booking path."""
+        gate = self._gates.get(session_id)
+        if gate is not None:
+            gate.loaded_at = 0.0
+
+    def stats(self) -> dict:
+        return {
+            "sessions": len(self._gates),
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "refreshes": self.refreshes
+        }
+
+
+session_admission = SessionAdmission(
+    refresh_seconds=SESSION_ADMISSION_REFRESH_SECONDS,
+    max_sessions=SESSION_ADMISSION_MAX_SESSIONS
+)
+register_metrics("session_admission", session_admission.stats)
@@ -0,0 +1,43 @@
+from backend.core.cache import TTLCache
+from backend.core.config import SEAT_OVERLAY_TTL_SECONDS, SEAT_OVERLAY_MAX_SIZE
+from backend.core.database import mongodb
+from backend.core.metrics import register_metrics
+
+
+class SeatOverlay:
+    """Live ``seats_booked`` per session id, layered over cached schedules.
+
+    Counts are cached for ``ttl`` seconds; the seat ``$inc`` paths invalidate
+    the sessions they touch, so this worker's bookings show up immediately and
+    other workers' within the TTL. Missing counts load in one ``$in`` query.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._counts = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.loads = 0
+
+    async def seats_booked(self, session_ids) -> dict:
+        counts, missing = {}, []
+        for session_id in session_ids:
+            count = self._counts.get(session_id)
+            if count is None:
+                missing.append(session_id)
+            else:
+                counts[session_id] = count
+
+        if missing:
+            self.loads += 1
+            async for row in mongodb.db.sessions.find({"id": {"$in": missing}}, {"_id": 0, "id": 1, "seats_booked": 1}):
+                counts[row["id"]] = row.get("seats_booked", 0)
+                self._counts.set(row["id"], counts[row["id"]])
+        return counts
+
+    def invalidate(self, session_id):
+        self._counts.invalidate(session_id)
+
+    def stats(self) -> dict:
+        return {**self._counts.stats(), "loads": self.loads}
+
+
+seat_overlay = SeatOverlay(maxsize=SEAT_OVERLAY_MAX_SIZE, ttl=SEAT_OVERLAY_TTL_SECONDS)
+register_metrics("seat_overlay", seat_overlay.stats)
@@ -1,35 +1,100 @@
+from pymongo.errors import BulkWriteError
+
 from backend.core.database import mongodb
+from backend.core.dataloader import get_loader, clear_loader, batch_find
+from backend.modules.sessions.admission import session_admission
+from backend.modules.sessions.cache import seat_overlay
+from backend.modules.listing.cache import schedule_cache
 
 class SessionRepository:
     async def add_session(self, session_doc):
-        return await mongodb.db.sessions.insert_one(session_doc)
+        result = await mongodb.db.sessions.insert_one(session_doc)
+        schedule_cache.invalidate_tag(session_doc.get("listing_id"))
+        return result
     
+    async def add_sessions(self, session_docs, chunk_size=1000):
+        """Insert sessions with unordered insert_many in chunks.
+
+        Sessions whose id already exists are skipped rather than failing the
+        batch. Returns ``(created_docs, skipped_count)``.
+        """
+        created, skipped = [], 0
+        for start in range(0, len(session_docs), chunk_size):
+            chunk = session_docs[start:start + chunk_size]
+            try:
+                await mongodb.db.sessions.insert_many(chunk, ordered=False)
+                created.extend(chunk)
+            except BulkWriteError as e:
+                errors = e.details.get("writeErrors", [])
+                if any(error.get("code") != 11000 for error in errors):
+                    raise
+                failed = {error["index"] for error in errors}
+                created.extend(doc for i, doc in enumerate(chunk) if i not in failed)
+                skipped += len(failed)
+        for listing_id in {doc.get("listing_id") for doc in created}:
+            schedule_cache.invalidate_tag(listing_id)
+        return created, skipped
+
     async def update_session(self, session_id):
-        return await mongodb.db.sessions.update_one(
+        session_admission.invalidate(session_id)
+        result = await mongodb.db.sessions.update_one(
                     {"id": session_id},
                     {"$inc": {"seats_booked": 1}}
                 )
+        clear_loader("sessions.id", session_id)
+        seat_overlay.invalidate(session_id)
+        return result
     
     async def update_remove_session(self, session_id):
-        return await mongodb.db.sessions.update_one(
+        session_admission.invalidate(session_id)
+        result = await mongodb.db.sessions.update_one(
                     {"id": session_id},
                     {"$inc": {"seats_booked": -1}}
                 )
+        clear_loader("sessions.id", session_id)
+        seat_overlay.invalidate(session_id)
+        return result
     
     async def atomic_seat_reservation(self, session_id, seats_total):
-        return await mongodb.db.update_one(
+        result = await mongodb.db.sessions.update_one(
                 {
                     "id": session_id,
                     "seats_booked": {"$lt": seats_total}
                 },
                 {"$inc": {"seats_booked": 1}}
             )
+        clear_loader("sessions.id", session_id)
+        seat_overlay.invalidate(session_id)
+        return result
     
     async def get_session(self, query):
          return await mongodb.db.sessions.find(query, {"_id": 0}).sort("date", 1).to_list(500)
     
     async def get_session_by_id(self, session_id):
-         return await mongodb.db.sessions.find({"id": session_id}, {"_id": 0})
+         loader = get_loader("sessions.id", batch_find("sessions", "id"))
+         if loader:
+              return await loader.load(session_id)
+         return await mongodb.db.sessions.find_one({"id": session_id}, {"_id": 0})
+    
+    async def get_full_sessions(self, session_ids):
+         return await mongodb.db.sessions.find({
+              "id": {"$in": session_ids},
+              "$or": [
+                   {"status": {"$ne": "scheduled"}},
+                   {"$expr": {"$gte": ["$seats_booked", "$seats_total"]}}
+              ]
+         }, {"_id": 0}).sort("start_at", 1).to_list(None)
+
+    async def get_listing_sessions_between(self, listing_id, start, end, limit=1000):
+         """Scheduled sessions of a listing starting in ``[start, end)``; one range scan on listing_id+status+start_at."""
+         return await mongodb.db.sessions.find({
+              "listing_id": listing_id,
+              "status": "scheduled",
+              "start_at": {"$gte": start, "$lt": end}
+         }, {"_id": 0}).sort("start_at", 1).limit(limit).to_list(None)
+
+    async def get_sessions_by_ids(self, session_ids):
+         return await mongodb.db.sessions.find({"id": {"$in": session_ids}}, {"_id": 0}).to_list(None)
     
     async def session_belong_to_listing(self, session_ids):
         return await mongodb.db.session.find(
@@ -52,7 +117,11 @@ class SessionRepository:
         }, {"_id": 0}).to_list(sessions_to_book)
     
     async def delete_session(self, session_id):
-        return await mongodb.db.sessions.delete_one({"id":session_id})
+        session = await mongodb.db.sessions.find_one_and_delete({"id": session_id}, {"_id": 0, "listing_id": 1})
+        clear_loader("sessions.id", session_id)
+        if session:
+            schedule_cache.invalidate_tag(session.get("listing_id"))
+        return session
     
     async def add_notification(self, notification_data):
         return await mongodb.db.notification.insert_one(notification_data)
@@ -0,0 +1,81 @@
+"""Contend for the last seats of one session, with and without admission control.
+
+    python -m backend.modules.sessions.stress_admission [-c 1000] [--seats 20]
+
+Creates a throwaway session, runs ``-c`` concurrent bookers against it and
+removes it again. Each booker does the same work as ``create_booking``
+around the seat ``$inc``: admission, simulated listing/wallet lookups,
+``SessionRepository.atomic_seat_reservation``, then settle and release.
+Needs a real MongoDB.
+"""
+import argparse
+import asyncio
+import time
+import uuid
+
+from backend.core.database import mongodb, connect_to_mongo, close_mongo_connection
+from backend.modules.sessions.admission import SessionAdmission
+from backend.modules.sessions.repository import SessionRepository
+
+
+async def _book(session_id: str, seats_total: int, admission, prework: float, outcome: dict):
+    ticket = None
+    try:
+        if admission:
+            ticket = await admission.acquire(session_id)
+            if ticket is None:
+                outcome["rejected"] += 1
+                return
+        # Stand-in for the listing, trial and wallet reads done before reserving
+        await asyncio.sleep(prework)
+        result = await SessionRepository().atomic_seat_reservation(session_id=session_id, seats_total=seats_total)
+        if ticket:
+            ticket.settle(reserved=result.modified_count > 0)
+        outcome["booked" if result.modified_count else "lost"] += 1
+    finally:
+        if ticket:
+            ticket.release()
+
+
+async def _round(label: str, concurrency: int, seats: int, prework: float, admission):
+    session_id = f"stress-{uuid.uuid4()}"
+    await mongodb.db.sessions.insert_one({
+        "id": session_id, "status": "scheduled", "seats_total": seats, "seats_booked": 0
+    })
+    outcome = {"booked": 0, "rejected": 0, "lost": 0}
+    try:
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            _book(session_id, seats, admission, prework, outcome) for _ in range(concurrency)
+        ))
+        elapsed = time.perf_counter() - started
+        final = await mongodb.db.sessions.find_one({"id": session_id}, {"_id": 0, "seats_booked": 1})
+    finally:
+        await mongodb.db.sessions.delete_one({"id": session_id})
+
+    print(
+        f"{label:<18} {concurrency} requests in {elapsed:.3f}s ({concurrency / elapsed:,.0f}/s) "
+        f"booked={outcome['booked']} rejected_up_front={outcome['rejected']} "
+        f"lost_at_db={outcome['lost']} seats_booked={final['seats_booked']}"
+    )
+    if final["seats_booked"] != seats or outcome["booked"] != seats:
+        raise SystemExit(f"❌ {label}: expected exactly {seats} seats booked")
+
+
+async def main(concurrency: int, seats: int, prework: float):
+    await connect_to_mongo()
+    try:
+        await _round("without admission", concurrency, seats, prework, None)
+        await _round("with admission", concurrency, seats, prework, SessionAdmission(refresh_seconds=2, max_sessions=10))
+        print("✅ No overbooking in either run")
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stress the seat admission gate")
+    parser.add_argument("-c", "--concurrency", type=int, default=1000, help="concurrent booking attempts")
+    parser.add_argument("--seats", type=int, default=20, help="seats on the test session")
+    parser.add_argument("--prework-ms", type=float, default=20, help="simulated lookups before reserving")
+    args = parser.parse_args()
+    asyncio.run(main(args.concurrency, args.seats, args.prework_ms / 1000))
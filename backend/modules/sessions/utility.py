@@ -0,0 +1,39 @@
+import uuid
+from datetime import datetime, timezone, timedelta
+
+# Namespace for deterministic session ids (uuid5)
+SESSION_ID_NAMESPACE = uuid.UUID("6f1c1f0e-3b0a-5d2e-9c41-7a8f3e2d1b60")
+# Length assumed for sessions stored without duration_minutes
+DEFAULT_SESSION_MINUTES = 90
+
+
+def session_id_for(listing_id: str, batch_id, start_at: datetime) -> str:
+    """Stable id for the session of ``listing_id``/``batch_id`` starting at ``start_at``.
+
+    Regenerating the same schedule yields the same ids, so repeated or retried
+    materialization requests cannot create duplicate sessions.
+    """
+    if start_at.tzinfo is None:
+        start_at = start_at.replace(tzinfo=timezone.utc)
+    key = f"{listing_id}|{batch_id or ''}|{start_at.astimezone(timezone.utc).isoformat()}"
+    return str(uuid.uuid5(SESSION_ID_NAMESPACE, key))
+
+
+def session_times_from_fields(date, time, duration_minutes) -> tuple:
+    """``(start_at, end_at)`` in UTC for a session stored with ``date``/``time`` strings."""
+    if isinstance(time, str):
+        parts = time.split(":")
+        hour, minute = int(parts[0]), int(parts[1]) if len(parts) > 1 else 0
+    else:
+        hour, minute = getattr(time, "hour", 0), getattr(time, "minute", 0)
+    start_at = datetime.fromisoformat(date).replace(hour=hour, minute=minute, second=0, microsecond=0, tzinfo=timezone.utc)
+    return start_at, start_at + timedelta(minutes=duration_minutes or DEFAULT_SESSION_MINUTES)
+
+
+def session_window(session: dict) -> tuple:
+    """``(start_at, end_at)`` of a session document, whichever time fields it was stored with."""
+    start_at = session.get("start_at")
+    if start_at is None:
+        return session_times_from_fields(session["date"], session["time"], session.get("duration_minutes"))
+    end_at = session.get("end_at") or start_at + timedelta(minutes=session.get("duration_minutes") or DEFAULT_SESSION_MINUTES)
+    return start_at, end_at
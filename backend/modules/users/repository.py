@@ -1,11 +1,16 @@
 from backend.core.database import mongodb
+from backend.core.dataloader import clear_loader
+from backend.core.cache import principal_cache
 
 class UserRepository:
     async def update_user_by_id(self, id, data):
-        return await mongodb.db.update_one(
+        result = await mongodb.db.update_one(
         {"id": id},
         {"$set": data}
     )
+        clear_loader("users.id", id)
+        principal_cache.invalidate(id)
+        return result
     async def get_user_detail_by_partner_id(self, partner_id):
         return await mongodb.db.find_one(
         {"id": partner_id, "role": "partner"}, 
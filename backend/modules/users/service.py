@@ -95,11 +95,11 @@ class UserService:
         if profile_data.get('onboardingCompleted') and tnc_acceptance:
             try:        
                 # Send confirmation email to partner
-                email_service.send_partner_registration_confirmation(partner_email=partner_email, partner_data=partner_data)
+                await email_service.send_partner_registration_confirmation(partner_email=partner_email, partner_data=partner_data)
                 
                 # Notify admin of new pending partner
                 admin_email = os.environ.get('ADMIN_EMAIL', 'admin@rrray.com')
-                email_service.send_admin_new_partner_notification(admin_email=admin_email,partner_data=partner_data)
+                await email_service.send_admin_new_partner_notification(admin_email=admin_email,partner_data=partner_data)
                 
             except Exception as e:
                 logging.error(f"Failed to send partner registration email: {e}")
@@ -5,6 +5,7 @@ from datetime import datetime, timezone
 import os
 import logging
 from backend.modules.venues.repositiry import VenueRepository
+from backend.modules.listing.cache import invalidate_listing
 from backend.core.email_service.email_instance import email_service
 
 
@@ -77,7 +78,7 @@ async def create_venue(data: VenueCreate, current_user: Dict = Depends(get_curre
                 lat = location['lat']
                 lng = location['lng']
         except Exception as e:
-            print(f"Geocoding error: {e}")
+            logging.warning(f"Geocoding error: {e}")
     
     venue = Venue(
         partner_id=partner["id"],
@@ -190,7 +191,7 @@ async def update_venue(venue_id: str, data: VenueCreate, current_user: Dict = De
                 lat = location['lat']
                 lng = location['lng']
         except Exception as e:
-            print(f"Geocoding error: {e}")
+            logging.warning(f"Geocoding error: {e}")
     
     await db.venues.update_one(
         {"id": venue_id},
@@ -209,6 +210,20 @@ async def update_venue(venue_id: str, data: VenueCreate, current_user: Dict = De
         }
     )
     
+    # Keep the GeoJSON location on this venue's listings in sync for $geoNear search
+    if lat is not None and lng is not None:
+        await db.listings.update_many(
+            {"venue_id": venue_id},
+            {"$set": {"location": {"type": "Point", "coordinates": [lng, lat]}}}
+        )
+    else:
+        await db.listings.update_many({"venue_id": venue_id}, {"$unset": {"location": ""}})
+    
+    # Cached search pages show venue details; a moved venue can change geo search results
+    changed_fields = {"location"} if (lat, lng) != (venue.get("lat"), venue.get("lng")) else ()
+    async for listing in db.listings.find({"venue_id": venue_id}, {"_id": 0, "id": 1}):
+        invalidate_listing(listing["id"], changed_fields)
+    
     return {"message": "Venue updated successfully"}
 
 @api_router.delete("/venues/{venue_id}")
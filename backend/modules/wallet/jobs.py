@@ -0,0 +1,39 @@
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timezone, timedelta
+
+from backend.core.config import WALLET_SNAPSHOT_MIN_ENTRIES
+from backend.core.database import mongodb
+from backend.core.leases import acquire_lease
+from backend.modules.wallet.repository import WalletRepository
+
+
+async def snapshot_wallets(since=None, min_entries=WALLET_SNAPSHOT_MIN_ENTRIES) -> int:
+    """Snapshot every wallet with ledger activity since ``since`` (all wallets when None)."""
+    repo = WalletRepository()
+    query = {"created_at": {"$gte": since}} if since else {}
+    taken = 0
+    for user_id in await mongodb.db.credit_ledger.distinct("user_id", query):
+        try:
+            if await repo.take_balance_snapshot(user_id, min_entries=min_entries):
+                taken += 1
+        except Exception as e:
+            logging.error(f"Failed to snapshot wallet for user {user_id}: {e}")
+    return taken
+
+
+async def run_wallet_snapshotter(interval_seconds: int):
+    """Periodically snapshot recently active wallets (started from main.lifespan in every worker; one runs it)."""
+    holder = str(uuid.uuid4())
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            if not await acquire_lease("wallet_snapshotter", holder, 2 * interval_seconds):
+                continue
+            # Look back two intervals so a missed or slow run does not skip users
+            since = datetime.now(timezone.utc) - timedelta(seconds=2 * interval_seconds)
+            taken = await snapshot_wallets(since=since)
+            logging.info(f"Took {taken} wallet balance snapshots")
+        except Exception as e:
+            logging.error(f"Wallet snapshot run failed: {e}")
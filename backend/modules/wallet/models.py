@@ -29,8 +29,9 @@ class CreditLedger(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     user_id: str
     delta: int
-    reason: str  # purchase, booking, refund, expiry, bonus
+    reason: str  # purchase, booking, refund, expiry, bonus, reconciliation_adjustment
     ref_booking_id: Optional[str] = None
+    note: Optional[str] = None
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 class PlanSubscribeRequest(BaseModel):
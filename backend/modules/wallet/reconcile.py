@@ -0,0 +1,229 @@
+"""Reconcile wallet balances against the credit ledger.
+
+    python -m backend.modules.wallet.reconcile [--partitions 16] [--workers 4] [--report drift.ndjson]
+    python -m backend.modules.wallet.reconcile --fix drift.ndjson
+
+Credits live in two collections (``wallet`` and ``wallets``) depending on
+which code path wrote them, so a user's balance is taken as the sum of both.
+Each user-id range is reconciled by one aggregation: ledger users and both
+wallet collections are brought together with ``$unionWith`` and ``$group``,
+and each user's ledger balance is their latest ``credit_snapshots`` entry
+plus the ledger tail after it. Only ledger entries created before the run
+started are counted. Users whose balance differs from their ledger balance
+come back as a cursor and are written to an NDJSON report. Ranges run
+concurrently; client memory holds one batch per range.
+
+The report run never writes. ``--fix`` is a separate run over a report: every
+drifted user that has a wallet is re-checked against the live ledger and
+wallets, and only if the drift is unchanged is a ``reconciliation_adjustment``
+ledger entry appended, so the ledger matches the balance they can spend.
+Balances themselves are never changed.
+"""
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from datetime import datetime, timezone
+
+from backend.core.database import connect_to_mongo, close_mongo_connection, mongodb
+from backend.modules.wallet.models import CreditLedger
+from backend.modules.wallet.repository import WalletRepository
+
+# Key space covered by the partition boundaries (first four hex digits of a uuid)
+ID_SPACE = 16 ** 4
+ADJUSTMENT_REASON = "reconciliation_adjustment"
+
+
+def user_id_ranges(partitions: int) -> list:
+    """[lo, hi) bounds that split hex user ids evenly; the outer bounds are open so no id is missed"""
+    bounds = [format(i * ID_SPACE // partitions, "04x") for i in range(1, partitions)]
+    return list(zip([None] + bounds, bounds + [None]))
+
+
+def _range_match(lo, hi) -> dict:
+    match = {}
+    if lo is not None:
+        match["$gte"] = lo
+    if hi is not None:
+        match["$lt"] = hi
+    return {"user_id": match} if match else {}
+
+
+def _balance_source(collection: str, match: dict) -> dict:
+    return {"$unionWith": {"coll": collection, "pipeline": [
+        {"$match": match},
+        {"$project": {"_id": 0, "user_id": 1, f"{collection}_balance": "$credits_balance", f"{collection}_docs": {"$literal": 1}}}
+    ]}}
+
+
+def drift_pipeline(lo, hi, started_at) -> list:
+    match = _range_match(lo, hi)
+    return [
+        # Distinct ledger users, read from the (user_id, created_at, id) index
+        {"$match": match},
+        {"$sort": {"user_id": 1}},
+        {"$group": {"_id": "$user_id"}},
+        {"$project": {"_id": 0, "user_id": "$_id"}},
+        _balance_source("wallet", match),
+        _balance_source("wallets", match),
+        {"$group": {
+            "_id": "$user_id",
+            "wallet_balance": {"$sum": "$wallet_balance"},
+            "wallets_balance": {"$sum": "$wallets_balance"},
+            "wallet_docs": {"$sum": "$wallet_docs"},
+            "wallets_docs": {"$sum": "$wallets_docs"}
+        }},
+        # Latest snapshot taken before the run started
+        {"$lookup": {
+            "from": "credit_snapshots",
+            "let": {"user_id": "$_id"},
+            "pipeline": [
+                {"$match": {"$expr": {"$and": [
+                    {"$eq": ["$user_id", "$$user_id"]},
+                    {"$lt": ["$as_of_created_at", started_at]}
+                ]}}},
+                {"$sort": {"as_of_created_at": -1, "as_of_id": -1}},
+                {"$limit": 1},
+                {"$project": {"_id": 0, "balance": 1, "entries": 1, "as_of_created_at": 1, "as_of_id": 1}}
+            ],
+            "as": "snapshot"
+        }},
+        {"$unwind": {"path": "$snapshot", "preserveNullAndEmptyArrays": True}},
+        # Ledger entries after the snapshot position and before the run started
+        {"$lookup": {
+            "from": "credit_ledger",
+            "let": {
+                "user_id": "$_id",
+                "as_of_created_at": {"$ifNull": ["$snapshot.as_of_created_at", None]},
+                "as_of_id": {"$ifNull": ["$snapshot.as_of_id", ""]}
+            },
+            "pipeline": [
+                {"$match": {"$expr": {"$and": [
+                    {"$eq": ["$user_id", "$$user_id"]},
+                    {"$lt": ["$created_at", started_at]},
+                    {"$or": [
+                        {"$eq": ["$$as_of_created_at", None]},
+                        {"$gt": ["$created_at", "$$as_of_created_at"]},
+                        {"$and": [
+                            {"$eq": ["$created_at", "$$as_of_created_at"]},
+                            {"$gt": ["$id", "$$as_of_id"]}
+                        ]}
+                    ]}
+                ]}}},
+                {"$group": {"_id": None, "total": {"$sum": "$delta"}, "entries": {"$sum": 1}}}
+            ],
+            "as": "tail"
+        }},
+        {"$unwind": {"path": "$tail", "preserveNullAndEmptyArrays": True}},
+        {"$project": {
+            "_id": 0,
+            "user_id": "$_id",
+            "ledger_total": {"$add": [{"$ifNull": ["$snapshot.balance", 0]}, {"$ifNull": ["$tail.total", 0]}]},
+            "ledger_entries": {"$add": [{"$ifNull": ["$snapshot.entries", 0]}, {"$ifNull": ["$tail.entries", 0]}]},
+            "wallet_balance": 1,
+            "wallets_balance": 1,
+            "has_wallet": {"$gt": [{"$add": ["$wallet_docs", "$wallets_docs"]}, 0]}
+        }},
+        {"$addFields": {"drift": {"$subtract": [{"$add": ["$wallet_balance", "$wallets_balance"]}, "$ledger_total"]}}},
+        {"$match": {"drift": {"$ne": 0}}}
+    ]
+
+
+async def reconcile_range(lo, hi, report, started_at, batch_size: int) -> dict:
+    summary = {"drifted": 0, "missing_wallet": 0, "net_drift": 0}
+    cursor = mongodb.db.credit_ledger.aggregate(drift_pipeline(lo, hi, started_at), allowDiskUse=True, batchSize=batch_size)
+    async for row in cursor:
+        summary["drifted"] += 1
+        summary["net_drift"] += row["drift"]
+        if not row["has_wallet"]:
+            summary["missing_wallet"] += 1
+        report.write(json.dumps(row) + "\n")
+    return summary
+
+
+async def reconcile_wallets(report, partitions: int = 16, workers: int = 4, batch_size: int = 1000) -> dict:
+    """Reconcile every user-id range, ``workers`` at a time, writing drifted users to ``report`` as NDJSON."""
+    started_at = datetime.now(timezone.utc)
+    semaphore = asyncio.Semaphore(workers)
+
+    async def run(lo, hi):
+        async with semaphore:
+            return await reconcile_range(lo, hi, report, started_at, batch_size)
+
+    results = await asyncio.gather(*(run(lo, hi) for lo, hi in user_id_ranges(partitions)))
+    return {key: sum(result[key] for result in results) for key in results[0]}
+
+
+async def current_drift(repo: WalletRepository, user_id: str) -> int:
+    """Live wallet balance (both collections) minus the live ledger balance"""
+    ledger = await repo.get_ledger_balance(user_id)
+    return await repo.get_wallet_balance(user_id) - ledger["balance"]
+
+
+async def apply_corrections(report_path: str, batch_size: int = 1000) -> dict:
+    """Append an adjustment for every drifted wallet in a report whose drift is unchanged on re-check."""
+    repo = WalletRepository()
+    run_id = str(uuid.uuid4())
+    summary = {"checked": 0, "corrected": 0, "changed": 0, "missing_wallet": 0}
+    corrections = []
+    with open(report_path) as report:
+        for line in report:
+            row = json.loads(line)
+            if not row["has_wallet"]:
+                summary["missing_wallet"] += 1
+                continue
+            summary["checked"] += 1
+            # Activity since the report run moves the drift; leave those users for the next run
+            if await current_drift(repo, row["user_id"]) != row["drift"]:
+                summary["changed"] += 1
+                continue
+            corrections.append(CreditLedger(
+                user_id=row["user_id"],
+                delta=row["drift"],
+                reason=ADJUSTMENT_REASON,
+                note=f"Wallet reconciliation {run_id}: ledger {row['ledger_total']} adjusted to wallet balance"
+            ).model_dump())
+            if len(corrections) >= batch_size:
+                await mongodb.db.credit_ledger.insert_many(corrections, ordered=False)
+                summary["corrected"] += len(corrections)
+                corrections = []
+    if corrections:
+        await mongodb.db.credit_ledger.insert_many(corrections, ordered=False)
+        summary["corrected"] += len(corrections)
+    return summary
+
+
+async def main(args):
+    await connect_to_mongo()
+    started = time.perf_counter()
+    try:
+        if args.fix:
+            summary = await apply_corrections(args.fix, args.batch_size)
+            print(
+                f"✅ Applied {args.fix} in {time.perf_counter() - started:.1f}s: {summary['corrected']} of "
+                f"{summary['checked']} drifted wallets corrected, {summary['changed']} skipped as changed since "
+                f"the report, {summary['missing_wallet']} without a wallet"
+            )
+            return
+
+        report_path = args.report or f"wallet_drift_{datetime.now(timezone.utc):%Y%m%d%H%M%S}.ndjson"
+        with open(report_path, "w") as report:
+            summary = await reconcile_wallets(report, args.partitions, args.workers, args.batch_size)
+        print(
+            f"✅ Reconciled in {time.perf_counter() - started:.1f}s: {summary['drifted']} drifted users "
+            f"({summary['missing_wallet']} without a wallet), net drift {summary['net_drift']} credits; "
+            f"report at {report_path}"
+        )
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reconcile wallet balances against the credit ledger")
+    parser.add_argument("--partitions", type=int, default=16, help="user-id ranges to split the work into")
+    parser.add_argument("--workers", type=int, default=4, help="ranges reconciled concurrently")
+    parser.add_argument("--batch-size", type=int, default=1000, help="cursor batch and correction insert size")
+    parser.add_argument("--report", help="NDJSON drift report path")
+    parser.add_argument("--fix", metavar="REPORT", help="re-check the users in a drift report and append adjustment entries")
+    asyncio.run(main(parser.parse_args()))
@@ -1,7 +1,17 @@
+import uuid
+from datetime import datetime, timezone, timedelta
+
+from backend.core.config import WALLET_SNAPSHOT_SETTLE_SECONDS, WALLET_SNAPSHOT_KEEP
 from backend.core.database import mongodb
 from backend.modules.wallet.models import Wallet, CreditTransaction, CreditLedger
 
 
+def _after(position):
+    """Ledger entries strictly after a (created_at, id) position"""
+    created_at, entry_id = position
+    return {"$or": [{"created_at": {"$gt": created_at}}, {"created_at": created_at, "id": {"$gt": entry_id}}]}
+
+
 class WalletRepository:
     async def wallet_exists(self, email: str) -> bool:
         return await mongodb.db.wallet.find_one({"email":email}) is not None
@@ -15,9 +25,20 @@ class WalletRepository:
     async def get_credit_plans_by_id(self, id):
         return await mongodb.db.credit_plans.find_one({"id":id}, {"_id": 0})
     
+    async def get_wallet_balance(self, user_id):
+        """Spendable credits across both wallet collections"""
+        balance = 0
+        for collection in ("wallet", "wallets"):
+            async for wallet in mongodb.db[collection].find({"user_id": user_id}, {"_id": 0, "credits_balance": 1}):
+                balance += wallet.get("credits_balance", 0)
+        return balance
+
     async def update_wallet(self, id: str, credits_used):
-        return await mongodb.db.wallet.find_one({"user_id": id},
-                    {"$inc": {"credits_balance": -credits_used}})
+        """Debit credits only if the balance covers them; matched_count is 0 otherwise"""
+        return await mongodb.db.wallet.update_one(
+            {"user_id": id, "credits_balance": {"$gte": credits_used}},
+            {"$inc": {"credits_balance": -credits_used}}
+        )
     
     async def grant_wallet_creadit(self, id, credit_balance, time ):
         return await mongodb.db.wallets.update_one(
@@ -44,4 +65,89 @@ class WalletRepository:
         return await mongodb.db.credit_ledger.insert_one(creadit_leadger.model_dump())
     
     async def get_credit_ledger_by_id(self, id):
-        return await mongodb.db.credit_ledger.find({"user_id": id}, {"_id": 0}).sort("created_at", -1).to_list(100)
\ No newline at end of file
+        return await mongodb.db.credit_ledger.find({"user_id": id}, {"_id": 0}).sort("created_at", -1).to_list(100)
+    
+    async def get_credit_ledger_page(self, user_id, limit=50, before=None):
+        """Newest-first ledger entries older than the ``before`` (created_at, id) position; returns limit + 1 rows to signal more"""
+        query = {"user_id": user_id}
+        if before:
+            created_at, entry_id = before
+            query["$or"] = [{"created_at": {"$lt": created_at}}, {"created_at": created_at, "id": {"$lt": entry_id}}]
+        return await mongodb.db.credit_ledger.find(query, {"_id": 0}) \
+            .sort([("created_at", -1), ("id", -1)]).limit(limit + 1).to_list(None)
+
+    # ---- balance snapshots (credit_snapshots) ----
+    #
+    # A snapshot records the ledger balance up to a (created_at, id) position.
+    # The balance at any time is the latest snapshot plus the entries after it,
+    # so verifying a wallet never scans the full history. Entries newer than
+    # WALLET_SNAPSHOT_SETTLE_SECONDS are left in the tail, so a slow insert with
+    # an earlier created_at cannot land behind a snapshot.
+
+    async def get_latest_snapshot(self, user_id):
+        return await mongodb.db.credit_snapshots.find_one(
+            {"user_id": user_id},
+            {"_id": 0},
+            sort=[("as_of_created_at", -1), ("as_of_id", -1)]
+        )
+
+    async def sum_ledger_tail(self, user_id, after=None, until=None):
+        """Sum, count and last position of ledger entries after ``after`` and up to ``until``"""
+        match = {"user_id": user_id}
+        if after:
+            match.update(_after(after))
+        if until:
+            match["created_at"] = {**match.get("created_at", {}), "$lt": until}
+        rows = await mongodb.db.credit_ledger.aggregate([
+            {"$match": match},
+            {"$sort": {"created_at": 1, "id": 1}},
+            {"$group": {
+                "_id": None,
+                "total": {"$sum": "$delta"},
+                "entries": {"$sum": 1},
+                "last_created_at": {"$last": "$created_at"},
+                "last_id": {"$last": "$id"}
+            }}
+        ]).to_list(1)
+        return rows[0] if rows else {"total": 0, "entries": 0, "last_created_at": None, "last_id": None}
+
+    async def get_ledger_balance(self, user_id):
+        """Balance implied by the ledger: latest snapshot plus the entries after it"""
+        snapshot = await self.get_latest_snapshot(user_id)
+        after = (snapshot["as_of_created_at"], snapshot["as_of_id"]) if snapshot else None
+        tail = await self.sum_ledger_tail(user_id, after=after)
+        return {
+            "balance": (snapshot["balance"] if snapshot else 0) + tail["total"],
+            "snapshot_at": snapshot["as_of_created_at"] if snapshot else None,
+            "tail_entries": tail["entries"]
+        }
+
+    async def take_balance_snapshot(self, user_id, min_entries=1):
+        """Roll settled tail entries into a new snapshot once at least ``min_entries`` have accumulated"""
+        snapshot = await self.get_latest_snapshot(user_id)
+        after = (snapshot["as_of_created_at"], snapshot["as_of_id"]) if snapshot else None
+        settled_before = datetime.now(timezone.utc) - timedelta(seconds=WALLET_SNAPSHOT_SETTLE_SECONDS)
+        tail = await self.sum_ledger_tail(user_id, after=after, until=settled_before)
+        if tail["entries"] < max(min_entries, 1):
+            return None
+
+        new_snapshot = {
+            "id": str(uuid.uuid4()),
+            "user_id": user_id,
+            "balance": (snapshot["balance"] if snapshot else 0) + tail["total"],
+            "entries": (snapshot["entries"] if snapshot else 0) + tail["entries"],
+            "as_of_created_at": tail["last_created_at"],
+            "as_of_id": tail["last_id"],
+            "created_at": datetime.now(timezone.utc)
+        }
+        await mongodb.db.credit_snapshots.insert_one(new_snapshot)
+        new_snapshot.pop("_id", None)
+        await self.prune_snapshots(user_id)
+        return new_snapshot
+
+    async def prune_snapshots(self, user_id, keep=WALLET_SNAPSHOT_KEEP):
+        """Drop all but the ``keep`` newest snapshots of a user"""
+        stale = await mongodb.db.credit_snapshots.find({"user_id": user_id}, {"_id": 0, "id": 1}) \
+            .sort([("as_of_created_at", -1), ("as_of_id", -1)]).skip(max(keep, 1)).to_list(None)
+        if stale:
+            await mongodb.db.credit_snapshots.delete_many({"user_id": user_id, "id": {"$in": [s["id"] for s in stale]}})
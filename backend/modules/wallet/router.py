@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, Request
-from typing import Dict
+from typing import Dict, Optional
+from backend.core.idempotency import Idempotency, IdempotentRequest
 from backend.modules.auth.utility import get_current_user
 from backend.modules.wallet.dependencies import get_wallet_service
 from backend.modules.wallet.service import WalletService
@@ -18,8 +19,9 @@ async def get_credit_plans(wallet_service: WalletService = Depends(get_wallet_se
 async def subscribe_plan(
     request: PlanSubscribeRequest, 
     current_user: Dict = Depends(get_current_user),
-    wallet_service: WalletService = Depends(get_wallet_service)):
-    return await wallet_service.subscribe_plan(request, current_user)
+    wallet_service: WalletService = Depends(get_wallet_service),
+    idempotency: IdempotentRequest = Depends(Idempotency("credit_plans.subscribe"))):
+    return await idempotency.run(current_user["id"], lambda: wallet_service.subscribe_plan(request, current_user))
 
 @wallet_router.get("/me")
 async def get_wallet(
@@ -29,9 +31,17 @@ async def get_wallet(
 
 @wallet_router.get("/ledger")
 async def get_ledger(    
+    cursor: Optional[str] = None,
+    limit: int = 50,
     current_user: Dict = Depends(get_current_user), 
     wallet_service: WalletService = Depends(get_wallet_service)):
-    return await wallet_service.get_ledger(current_user)
+    return await wallet_service.get_ledger(current_user, cursor, limit)
+
+@wallet_router.get("/verify")
+async def verify_wallet(
+    current_user: Dict = Depends(get_current_user),
+    wallet_service: WalletService = Depends(get_wallet_service)):
+    return await wallet_service.verify_wallet(current_user)
 
 @wallet_router.post("/activate")
 async def activate_wallet(
@@ -12,6 +12,7 @@ from backend.modules.sessions.repository import SessionRepository
 from backend.modules.booking.repository import BookingRepository
 from backend.modules.invoice.repository import InvoiceRepository
 from backend.modules.wallet.models import CreditLedger, PlanSubscribeRequest, Wallet
+from backend.modules.wallet.utility import encode_ledger_cursor, decode_ledger_cursor
 
 
 
@@ -79,9 +80,34 @@ class WalletService:
         return wallet
 
 
-    async def get_ledger(self, current_user: Dict):
-        ledger = await self.wallet_repo.get_credit_ledger_by_id(id=current_user["id"])
-        return {"ledger": ledger}
+    async def get_ledger(self, current_user: Dict, cursor: Optional[str] = None, limit: int = 50):
+        try:
+            before = decode_ledger_cursor(cursor) if cursor else None
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        limit = max(1, min(limit, 200))
+
+        ledger = await self.wallet_repo.get_credit_ledger_page(current_user["id"], limit=limit, before=before)
+        has_more = len(ledger) > limit
+        ledger = ledger[:limit]
+        return {
+            "ledger": ledger,
+            "next_cursor": encode_ledger_cursor(ledger[-1]) if has_more else None,
+            "has_more": has_more
+        }
+
+
+    async def verify_wallet(self, current_user: Dict):
+        """Compare the spendable balance with the balance implied by the ledger"""
+        wallet_balance = await self.wallet_repo.get_wallet_balance(current_user["id"])
+        ledger = await self.wallet_repo.get_ledger_balance(current_user["id"])
+        return {
+            "wallet_balance": wallet_balance,
+            "ledger_balance": ledger["balance"],
+            "drift": wallet_balance - ledger["balance"],
+            "snapshot_at": ledger["snapshot_at"],
+            "tail_entries": ledger["tail_entries"]
+        }
 
 
     async def activate_wallet(self, bonus_credits, current_user):
@@ -0,0 +1,18 @@
+import base64
+import json
+from datetime import datetime
+
+
+def encode_ledger_cursor(entry: dict) -> str:
+    """Opaque cursor holding the (created_at, id) position of the last ledger entry on a page"""
+    key = [entry["created_at"].isoformat(), entry["id"]]
+    return base64.urlsafe_b64encode(json.dumps(key).encode("utf-8")).decode("ascii")
+
+
+def decode_ledger_cursor(cursor: str) -> tuple:
+    """Inverse of encode_ledger_cursor; raises ValueError on a malformed cursor"""
+    try:
+        created_at, entry_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return datetime.fromisoformat(created_at), str(entry_id)
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e